@@ -8,117 +8,51 @@ Generates a 3D printable human brain model with:
   - Cerebellum (smaller bumpy structure at the back-bottom)
   - Brain stem extending downward
 
+With SDF = True the parts are instead modelled as one signed distance
+field (mesh_sdf): smooth-unioned ellipsoids and a tapered stem, the
+fissure cut out, and the wrinkles added as displacement.  The parts
+fuse into a single watertight surface.
+
 Output: brain.stl + brain.3mf
 Dimensions: ~100mm wide, ~120mm long, ~80mm tall (printable on most beds)
 """
 import math
-import os
-import random
-import zipfile
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_cache
+import mesh_check
+import mesh_core
+import mesh_io
+import mesh_sdf
+import mesh_stream
 
 OUTPUT_STL = "brain.stl"
 OUTPUT_3MF = "brain.3mf"
+DECIMATE_RMS = None     # mm, e.g. 0.1: simplify the parametric brain (off: exact grid)
+STREAM = False          # write straight to disk, undecimated (for huge res_u/res_v)
+STREAM_RES = 10         # grid resolution multiplier for the streamed build
+STREAM_CHECK = False    # re-read the streamed 3MF and check it (loads it whole)
+SDF = False             # model as one implicit surface (mesh_sdf) instead
+SDF_CELL = 0.8          # mm; SDF grid spacing
+SDF_DECIMATE_RMS = 0.1  # mm; RMS error allowed when simplifying the SDF mesh
 
 
-class Mesh:
-    def __init__(self):
-        self.verts = []
-        self.tris = []
-        self._vmap = {}
-
-    def v(self, x, y, z):
-        key = (round(x, 4), round(y, 4), round(z, 4))
-        if key not in self._vmap:
-            self._vmap[key] = len(self.verts)
-            self.verts.append(key)
-        return self._vmap[key]
-
-    def tri(self, a, b, c):
-        ia, ib, ic = self.v(*a), self.v(*b), self.v(*c)
-        if ia != ib and ib != ic and ia != ic:
-            self.tris.append((ia, ib, ic))
-
-    def quad(self, a, b, c, d):
-        self.tri(a, b, c)
-        self.tri(a, c, d)
-
-    def _normal(self, ia, ib, ic):
-        a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-        ux, uy, uz = b[0]-a[0], b[1]-a[1], b[2]-a[2]
-        vx, vy, vz = c[0]-a[0], c[1]-a[1], c[2]-a[2]
-        nx = uy*vz - uz*vy
-        ny = uz*vx - ux*vz
-        nz = ux*vy - uy*vx
-        ln = math.sqrt(nx*nx + ny*ny + nz*nz)
-        return (nx/ln, ny/ln, nz/ln) if ln > 1e-12 else (0, 0, 1)
-
-    def save_stl(self, path):
-        with open(path, 'w') as f:
-            f.write("solid brain\n")
-            for ia, ib, ic in self.tris:
-                n = self._normal(ia, ib, ic)
-                a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-                f.write(f"  facet normal {n[0]:.6e} {n[1]:.6e} {n[2]:.6e}\n")
-                f.write("    outer loop\n")
-                f.write(f"      vertex {a[0]:.6e} {a[1]:.6e} {a[2]:.6e}\n")
-                f.write(f"      vertex {b[0]:.6e} {b[1]:.6e} {b[2]:.6e}\n")
-                f.write(f"      vertex {c[0]:.6e} {c[1]:.6e} {c[2]:.6e}\n")
-                f.write("    endloop\n  endfacet\n")
-            f.write("endsolid brain\n")
-        kb = os.path.getsize(path) // 1024
-        print(f"  STL: {len(self.tris)} tris, {kb} KB -> {path}")
-
-    def save_3mf(self, path):
-        vlines = [f'          <vertex x="{x}" y="{y}" z="{z}"/>'
-                  for x, y, z in self.verts]
-        tlines = [f'          <triangle v1="{a}" v2="{b}" v3="{c}"/>'
-                  for a, b, c in self.tris]
-        model_xml = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<model unit="millimeter" '
-            'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
-            '  <metadata name="Application">BrainGen</metadata>\n'
-            '  <resources>\n'
-            '    <object id="1" type="model">\n'
-            '      <mesh>\n'
-            '        <vertices>\n' + '\n'.join(vlines) + '\n'
-            '        </vertices>\n'
-            '        <triangles>\n' + '\n'.join(tlines) + '\n'
-            '        </triangles>\n'
-            '      </mesh>\n'
-            '    </object>\n'
-            '  </resources>\n'
-            '  <build>\n'
-            '    <item objectid="1"/>\n'
-            '  </build>\n'
-            '</model>'
-        )
-        content_types = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
-            '  <Default Extension="rels" ContentType='
-            '"application/vnd.openxmlformats-package.relationships+xml"/>\n'
-            '  <Default Extension="model" ContentType='
-            '"application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
-            '</Types>'
-        )
-        rels = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<Relationships xmlns='
-            '"http://schemas.openxmlformats.org/package/2006/relationships">\n'
-            '  <Relationship Target="/3D/3dmodel.model" Id="rel0" '
-            'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
-            '</Relationships>'
-        )
-        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr("3D/3dmodel.model", model_xml)
-            zf.writestr("[Content_Types].xml", content_types)
-            zf.writestr("_rels/.rels", rels)
-        kb = os.path.getsize(path) // 1024
-        print(f"  3MF: {len(self.tris)} tris, {kb} KB -> {path}")
+class Mesh(mesh_core.Mesh):
+    APP = "BrainGen"
 
 
 # ── Noise function for brain wrinkles ──────────────────────
+# All noise helpers take NumPy arrays (or scalars) and evaluate every point
+# at once.  Integer hashing runs in int64: wrap-around multiplication keeps
+# the low bits that _noise3d reads identical to exact integer math, and the
+# float blending follows the original operation order, so the same seeds
+# reproduce the same brain bit for bit.
 
 def _hash_int(n):
     """Simple integer hash for deterministic noise."""
@@ -129,25 +63,31 @@ def _hash_int(n):
 
 def _noise3d(x, y, z, seed=0):
     """Simple value noise in 3D for organic surface displacement."""
-    ix, iy, iz = int(math.floor(x)), int(math.floor(y)), int(math.floor(z))
+    x, y, z = (np.asarray(a, np.float64) for a in (x, y, z))
+    ix, iy, iz = (np.floor(a).astype(np.int64) for a in (x, y, z))
     fx, fy, fz = x - ix, y - iy, z - iz
     # Smoothstep
     fx = fx * fx * (3 - 2 * fx)
     fy = fy * fy * (3 - 2 * fy)
     fz = fz * fz * (3 - 2 * fz)
 
+    # Lattice terms for both corners on each axis
+    hx = (ix * 73856093, (ix + 1) * 73856093)
+    hy = (iy * 19349663, (iy + 1) * 19349663)
+    hz = (iz * 83492791, (iz + 1) * 83492791)
+
     def _val(i, j, k):
-        h = _hash_int(i * 73856093 ^ j * 19349663 ^ k * 83492791 ^ seed)
+        h = _hash_int(hx[i] ^ hy[j] ^ hz[k] ^ seed)
         return (h & 0xFFFF) / 65535.0
 
-    v000 = _val(ix, iy, iz)
-    v100 = _val(ix+1, iy, iz)
-    v010 = _val(ix, iy+1, iz)
-    v110 = _val(ix+1, iy+1, iz)
-    v001 = _val(ix, iy, iz+1)
-    v101 = _val(ix+1, iy, iz+1)
-    v011 = _val(ix, iy+1, iz+1)
-    v111 = _val(ix+1, iy+1, iz+1)
+    v000 = _val(0, 0, 0)
+    v100 = _val(1, 0, 0)
+    v010 = _val(0, 1, 0)
+    v110 = _val(1, 1, 0)
+    v001 = _val(0, 0, 1)
+    v101 = _val(1, 0, 1)
+    v011 = _val(0, 1, 1)
+    v111 = _val(1, 1, 1)
 
     v00 = v000 * (1-fx) + v100 * fx
     v10 = v010 * (1-fx) + v110 * fx
@@ -169,6 +109,27 @@ def brain_noise(x, y, z):
     return val
 
 
+def _sincos(angles):
+    """sin/cos of a short list of angles as arrays.
+
+    Uses math.sin/cos (only one value per grid row or column) so the grid
+    matches the original per-point math exactly.
+    """
+    return (np.array([math.sin(a) for a in angles]),
+            np.array([math.cos(a) for a in angles]))
+
+
+def _push_radial(bx, by, bz, disp):
+    """Displace points by `disp` along their (approximate) radial normal."""
+    ln = np.sqrt(bx*bx + by*by + bz*bz)
+    ok = ln > 0.01
+    ln = np.where(ok, ln, 1.0)
+    bx = np.where(ok, bx + disp * bx / ln, bx)
+    by = np.where(ok, by + disp * by / ln, by)
+    bz = np.where(ok, bz + disp * bz / ln, bz)
+    return bx, by, bz
+
+
 # ── Brain geometry ─────────────────────────────────────────
 
 def make_hemisphere(mesh, cx, cy, cz, rx, ry, rz, side, res_u=48, res_v=32):
@@ -176,89 +137,61 @@ def make_hemisphere(mesh, cx, cy, cz, rx, ry, rz, side, res_u=48, res_v=32):
     Generate one brain hemisphere as a wrinkly half-ellipsoid.
     side: +1 for right hemisphere, -1 for left hemisphere.
     The flat face (medial) is on the side facing x=cx.
-    """
-    pts = []
-    for iv in range(res_v + 1):
-        v = iv / res_v  # 0..1
-        phi = v * math.pi  # 0..pi (top to bottom)
-        row = []
-        for iu in range(res_u + 1):
-            u = iu / res_u  # 0..1
-            # theta goes from front to back to medial face
-            if side > 0:
-                theta = u * math.pi  # 0..pi (right hemisphere)
-            else:
-                theta = math.pi + u * math.pi  # pi..2pi (left hemisphere)
-
-            # Base ellipsoid point
-            sp = math.sin(phi)
-            cp_ = math.cos(phi)
-            st = math.sin(theta)
-            ct = math.cos(theta)
-
-            bx = rx * st * sp
-            by = ry * cp_
-            bz = rz * ct * sp
-
-            # Brain shape modifications:
-            # 1) Flatten the bottom slightly
-            if by < -ry * 0.3:
-                by = -ry * 0.3 + (by + ry * 0.3) * 0.4
-
-            # 2) Frontal lobe bulge (front = +z direction)
-            frontal = max(0, bz / rz)
-            bx *= 1.0 + 0.08 * frontal
-            by *= 1.0 + 0.05 * frontal
-
-            # 3) Temporal lobe bulge (sides, lower)
-            temporal = max(0, abs(bx) / rx - 0.3) * max(0, -by / ry)
-            bx *= 1.0 + 0.15 * temporal
-
-            # 4) Occipital lobe (back = -z) slight bump
-            occipital = max(0, -bz / rz - 0.5)
-            bz *= 1.0 + 0.1 * occipital
-
-            # 5) Longitudinal fissure: flatten medial face
-            # Make the inner face (near x=0) flatter
-            medial_dist = abs(bx) / rx
-            if medial_dist < 0.15:
-                bx *= 0.6 + 0.4 * (medial_dist / 0.15)
-
-            # 6) Wrinkle displacement via noise
-            nx_ = (cx + bx) * 0.08
-            ny_ = (cy + by) * 0.08
-            nz_ = (cz + bz) * 0.08
-            wrinkle = brain_noise(nx_, ny_, nz_) - 0.5  # centered around 0
-            # Scale wrinkle: deeper grooves on top, shallower on bottom
-            top_factor = max(0.2, (by + ry) / (2 * ry))
-            disp = wrinkle * 3.0 * top_factor
-            # Displace along the surface normal direction (approximate = radial)
-            ln = math.sqrt(bx*bx + by*by + bz*bz)
-            if ln > 0.01:
-                bx += disp * bx / ln
-                by += disp * by / ln
-                bz += disp * bz / ln
-
-            row.append((cx + bx, cy + by, cz + bz))
-        pts.append(row)
-
-    # Triangulate the grid
-    for iv in range(res_v):
-        for iu in range(res_u):
-            a = pts[iv][iu]
-            b = pts[iv][iu + 1]
-            c = pts[iv + 1][iu + 1]
-            d = pts[iv + 1][iu]
-            mesh.quad(a, b, c, d)
 
-    # Cap the flat medial face
-    medial_pts = []
-    for iv in range(res_v + 1):
-        if side > 0:
-            medial_pts.append(pts[iv][res_u])  # last column
-        else:
-            medial_pts.append(pts[iv][res_u])  # last column wraps to medial
-    # Fan triangulate the medial face
+    The whole (res_v+1) x (res_u+1) point grid is computed at once.
+    """
+    # phi: 0..pi (top to bottom) down the rows
+    sp, cp_ = _sincos([(iv / res_v) * math.pi for iv in range(res_v + 1)])
+    # theta goes from front to back to medial face across the columns
+    u = [iu / res_u for iu in range(res_u + 1)]
+    if side > 0:
+        st, ct = _sincos([x * math.pi for x in u])  # 0..pi (right hemisphere)
+    else:
+        st, ct = _sincos([math.pi + x * math.pi for x in u])  # pi..2pi (left)
+    sp, cp_ = sp[:, None], cp_[:, None]
+
+    # Base ellipsoid point
+    bx = rx * st * sp
+    by = np.broadcast_to(ry * cp_, bx.shape)
+    bz = rz * ct * sp
+
+    # Brain shape modifications:
+    # 1) Flatten the bottom slightly
+    by = np.where(by < -ry * 0.3, -ry * 0.3 + (by + ry * 0.3) * 0.4, by)
+
+    # 2) Frontal lobe bulge (front = +z direction)
+    frontal = np.maximum(0, bz / rz)
+    bx = bx * (1.0 + 0.08 * frontal)
+    by = by * (1.0 + 0.05 * frontal)
+
+    # 3) Temporal lobe bulge (sides, lower)
+    temporal = np.maximum(0, np.abs(bx) / rx - 0.3) * np.maximum(0, -by / ry)
+    bx = bx * (1.0 + 0.15 * temporal)
+
+    # 4) Occipital lobe (back = -z) slight bump
+    occipital = np.maximum(0, -bz / rz - 0.5)
+    bz = bz * (1.0 + 0.1 * occipital)
+
+    # 5) Longitudinal fissure: flatten medial face
+    # Make the inner face (near x=0) flatter
+    medial_dist = np.abs(bx) / rx
+    bx = np.where(medial_dist < 0.15, bx * (0.6 + 0.4 * (medial_dist / 0.15)), bx)
+
+    # 6) Wrinkle displacement via noise
+    nx_ = (cx + bx) * 0.08
+    ny_ = (cy + by) * 0.08
+    nz_ = (cz + bz) * 0.08
+    wrinkle = brain_noise(nx_, ny_, nz_) - 0.5  # centered around 0
+    # Scale wrinkle: deeper grooves on top, shallower on bottom
+    top_factor = np.maximum(0.2, (by + ry) / (2 * ry))
+    disp = wrinkle * 3.0 * top_factor
+    # Displace along the surface normal direction (approximate = radial)
+    bx, by, bz = _push_radial(bx, by, bz, disp)
+
+    pts = np.stack([cx + bx, cy + by, cz + bz], axis=-1).tolist()
+
+    # Fan centre of the flat medial face cap over the last column
+    medial_pts = [row[res_u] for row in pts]
     center = [0.0, 0.0, 0.0]
     for p in medial_pts:
         center[0] += p[0]
@@ -266,11 +199,20 @@ def make_hemisphere(mesh, cx, cy, cz, rx, ry, rz, side, res_u=48, res_v=32):
         center[2] += p[2]
     n = len(medial_pts)
     center = (center[0]/n, center[1]/n, center[2]/n)
-    for i in range(n - 1):
+
+    # Triangulate the grid, each row followed by its slice of the cap so a
+    # MeshSink still has the row's medial points in its weld window
+    for iv in range(res_v):
+        for iu in range(res_u):
+            a = pts[iv][iu]
+            b = pts[iv][iu + 1]
+            c = pts[iv + 1][iu + 1]
+            d = pts[iv + 1][iu]
+            mesh.quad(a, b, c, d)
         if side > 0:
-            mesh.tri(center, medial_pts[i+1], medial_pts[i])
+            mesh.tri(center, medial_pts[iv+1], medial_pts[iv])
         else:
-            mesh.tri(center, medial_pts[i], medial_pts[i+1])
+            mesh.tri(center, medial_pts[iv], medial_pts[iv+1])
 
 
 def make_cerebellum(mesh, cx, cy, cz, rx, ry, rz, res_u=32, res_v=20):
@@ -278,41 +220,27 @@ def make_cerebellum(mesh, cx, cy, cz, rx, ry, rz, res_u=32, res_v=20):
     Generate the cerebellum: smaller bumpy structure at back-bottom of brain.
     Uses higher-frequency noise for the characteristic layered look.
     """
-    pts = []
-    for iv in range(res_v + 1):
-        v = iv / res_v
-        phi = v * math.pi
-        row = []
-        for iu in range(res_u + 1):
-            u = iu / res_u
-            theta = u * 2 * math.pi
+    sp, cp_ = _sincos([(iv / res_v) * math.pi for iv in range(res_v + 1)])
+    st, ct = _sincos([(iu / res_u) * 2 * math.pi for iu in range(res_u + 1)])
 
-            sp = math.sin(phi)
-            cp_ = math.cos(phi)
-            st = math.sin(theta)
-            ct = math.cos(theta)
-
-            bx = rx * st * sp
-            by = ry * cp_
-            bz = rz * ct * sp
-
-            # Flatten top where it meets the cerebrum
-            if by > ry * 0.3:
-                by = ry * 0.3
-
-            # Cerebellum ridges: horizontal lines (folia)
-            ridge = math.sin(by * 3.0) * 0.8
-            nx_ = (cx + bx) * 0.15
-            nz_ = (cz + bz) * 0.15
-            ridge += _noise3d(nx_, by * 0.2, nz_, seed=999) * 0.5
-            ln = math.sqrt(bx*bx + by*by + bz*bz)
-            if ln > 0.01:
-                bx += ridge * bx / ln
-                by += ridge * by / ln
-                bz += ridge * bz / ln
-
-            row.append((cx + bx, cy + by, cz + bz))
-        pts.append(row)
+    # Rows share one height, so the row-wise terms stay 1D
+    by_row = ry * cp_
+    # Flatten top where it meets the cerebrum
+    by_row = np.where(by_row > ry * 0.3, ry * 0.3, by_row)
+    # Cerebellum ridges: horizontal lines (folia)
+    ridge_row = np.array([math.sin(b * 3.0) * 0.8 for b in by_row.tolist()])
+
+    sp = sp[:, None]
+    bx = rx * st * sp
+    bz = rz * ct * sp
+    by = np.broadcast_to(by_row[:, None], bx.shape)
+
+    nx_ = (cx + bx) * 0.15
+    nz_ = (cz + bz) * 0.15
+    ridge = ridge_row[:, None] + _noise3d(nx_, by * 0.2, nz_, seed=999) * 0.5
+    bx, by, bz = _push_radial(bx, by, bz, ridge)
+
+    pts = np.stack([cx + bx, cy + by, cz + bz], axis=-1).tolist()
 
     for iv in range(res_v):
         for iu in range(res_u):
@@ -361,10 +289,11 @@ def make_brain_stem(mesh, cx, cy, cz, radius, length, res=16):
         mesh.tri(center, bottom_ring[i+1], bottom_ring[i])
 
 
-def build_brain():
-    """Assemble the full brain model."""
-    m = Mesh()
+def add_brain(m, res=1):
+    """Add all brain parts to `m` (a Mesh or a mesh_stream.MeshSink).
 
+    res multiplies the grid resolution of every part.
+    """
     # Brain dimensions (mm)
     # Full brain ~140mm long, ~100mm wide, ~80mm tall
     hemi_rx = 24.0   # half-width of each hemisphere (lateral)
@@ -376,35 +305,92 @@ def build_brain():
 
     print("Generating right hemisphere...")
     make_hemisphere(m, gap/2 + hemi_rx * 0.15, 10, 0,
-                    hemi_rx, hemi_ry, hemi_rz, side=+1)
+                    hemi_rx, hemi_ry, hemi_rz, side=+1, res_u=48 * res, res_v=32 * res)
 
     print("Generating left hemisphere...")
     make_hemisphere(m, -(gap/2 + hemi_rx * 0.15), 10, 0,
-                    hemi_rx, hemi_ry, hemi_rz, side=-1)
+                    hemi_rx, hemi_ry, hemi_rz, side=-1, res_u=48 * res, res_v=32 * res)
 
     # Cerebellum: sits at back-bottom, behind and below the cerebrum
     cb_rx = 22.0
     cb_ry = 14.0
     cb_rz = 16.0
     print("Generating cerebellum...")
-    make_cerebellum(m, 0, -18, -38, cb_rx, cb_ry, cb_rz)
+    make_cerebellum(m, 0, -18, -38, cb_rx, cb_ry, cb_rz, res_u=32 * res, res_v=20 * res)
 
     # Brain stem: extends downward from center-bottom
     print("Generating brain stem...")
-    make_brain_stem(m, 0, -25, -30, radius=6.0, length=25.0)
+    make_brain_stem(m, 0, -25, -30, radius=6.0, length=25.0, res=16 * res)
+
+
+def _sulci(p):
+    """Cerebrum wrinkle displacement (mm) at points p, as in make_hemisphere."""
+    wrinkle = brain_noise(p[:, 0] * 0.08, p[:, 1] * 0.08, p[:, 2] * 0.08) - 0.5
+    top_factor = np.maximum(0.2, (p[:, 1] - 10 + 35.0) / 70.0)
+    return wrinkle * 3.0 * top_factor
+
+
+def _folia(p):
+    """Cerebellum ridges (mm) at points p, as in make_cerebellum."""
+    by = p[:, 1] + 18
+    return np.sin(by * 3.0) * 0.8 + _noise3d(p[:, 0] * 0.15, by * 0.2, p[:, 2] * 0.15, seed=999) * 0.5
+
 
+def brain_field():
+    """The whole brain as one signed distance field."""
+    hemi_rx, hemi_ry, hemi_rz = 24.0, 35.0, 55.0
+    gap = 2.0
+    cx = gap/2 + hemi_rx * 0.15
+    cerebrum = mesh_sdf.SmoothUnion(
+        2.0, *(mesh_sdf.Ellipsoid((side * cx, 10, 0), (hemi_rx, hemi_ry, hemi_rz))
+               for side in (+1, -1)))
+    # Longitudinal fissure: cut from the top down to just above centre
+    fissure = mesh_sdf.Box((-gap/2, 10 - hemi_ry * 0.1, -hemi_rz - 5),
+                           (gap/2, 10 + hemi_ry + 5, hemi_rz + 5))
+    cerebrum = mesh_sdf.Displace(mesh_sdf.Difference(cerebrum, fissure, 1.0), _sulci, 1.5)
+    cerebellum = mesh_sdf.Displace(mesh_sdf.Ellipsoid((0, -18, -38), (22.0, 14.0, 16.0)),
+                                   _folia, 1.3)
+    stem = mesh_sdf.Capsule((0, -25, -30), (0, -50, -30), 6.0, 3.6)
+    return mesh_sdf.SmoothUnion(4.0, cerebrum, cerebellum, stem)
+
+
+def build_brain():
+    """Assemble the full brain model."""
+    m = Mesh()
+    if SDF:
+        print(f"Polygonizing brain field ({SDF_CELL} mm cells)...")
+        m.add_geometry(*mesh_sdf.polygonize(brain_field(), SDF_CELL))
+    else:
+        add_brain(m)
+    # The polygonized field is always simplified; the parametric grid only
+    # when asked to
+    rms = SDF_DECIMATE_RMS if SDF else DECIMATE_RMS
+    if rms is not None:
+        removed = m.decimate(max_rms=rms)
+        print(f"Decimated: -{removed} triangles (RMS error {rms} mm)")
     return m
 
 
 def main():
     print("=== Brain Model Generator ===")
     print()
-    m = build_brain()
+    if STREAM:
+        with mesh_stream.MeshSink(OUTPUT_STL, OUTPUT_3MF, app=Mesh.APP, name="brain") as sink:
+            add_brain(sink, STREAM_RES)
+        print(f"  STL + 3MF  {sink.n_tris} tris (streamed, not decimated)  ->  "
+              f"{OUTPUT_STL}, {OUTPUT_3MF}")
+        if STREAM_CHECK:
+            # The sink never holds the mesh; read the indexed 3MF back to
+            # check that the windowed weld closed it like an in-memory build
+            print(mesh_check.summary(mesh_check.check(*mesh_io.read_3mf(OUTPUT_3MF))))
+        return
+    m = mesh_cache.cached_build(build_brain, mesh_cache.cache_dir_for(OUTPUT_STL))
     print()
     print(f"Total: {len(m.verts)} vertices, {len(m.tris)} triangles")
     print()
     m.save_stl(OUTPUT_STL)
     m.save_3mf(OUTPUT_3MF)
+    m.check()
     print()
     print("Done! Files ready for slicing.")
 
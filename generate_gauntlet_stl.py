@@ -21,134 +21,39 @@ Prints standing up (Y axis vertical). Tree supports handle it.
 """
 import math
 import os
-import zipfile
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_cache
+import mesh_core
+import mesh_prims
 
 OUTPUT_STL = "gauntlet.stl"
 OUTPUT_3MF = "gauntlet.3mf"
+DECIMATE_RMS = None     # mm, e.g. 0.1: simplify the finished mesh (off: exact output)
+
+# Tree-support settings embedded in the 3MF. Bambu Studio reads print
+# settings from Metadata/plate_1.config and the project config.
+_SUPPORT_CFG = (
+    'enable_support = 1\n'
+    'support_type = tree(auto)\n'
+    'support_on_build_plate_only = 0\n'
+    'support_threshold_angle = 30\n'
+)
+SLICER_CONFIG = {
+    'Metadata/Slic3r_PE.config': '; Gauntlet tree supports\n' + _SUPPORT_CFG,
+    'Metadata/plate_1.config': '; plate config\n' + _SUPPORT_CFG,
+    'Metadata/project_config.config': '; project config\n' + _SUPPORT_CFG,
+}
 
 
-class Mesh:
-    def __init__(self):
-        self.verts = []
-        self.tris = []
-        self._vmap = {}
-
-    def v(self, x, y, z):
-        key = (round(x, 4), round(y, 4), round(z, 4))
-        if key not in self._vmap:
-            self._vmap[key] = len(self.verts)
-            self.verts.append(key)
-        return self._vmap[key]
-
-    def tri(self, a, b, c):
-        ia, ib, ic = self.v(*a), self.v(*b), self.v(*c)
-        if ia != ib and ib != ic and ia != ic:
-            self.tris.append((ia, ib, ic))
-
-    def quad(self, a, b, c, d):
-        self.tri(a, b, c)
-        self.tri(a, c, d)
-
-    def _normal(self, ia, ib, ic):
-        a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-        ux, uy, uz = b[0]-a[0], b[1]-a[1], b[2]-a[2]
-        vx, vy, vz = c[0]-a[0], c[1]-a[1], c[2]-a[2]
-        nx = uy*vz - uz*vy
-        ny = uz*vx - ux*vz
-        nz = ux*vy - uy*vx
-        ln = math.sqrt(nx*nx + ny*ny + nz*nz)
-        return (nx/ln, ny/ln, nz/ln) if ln > 1e-12 else (0, 0, 1)
-
-    def save_stl(self, path):
-        with open(path, 'w') as f:
-            f.write("solid gauntlet\n")
-            for ia, ib, ic in self.tris:
-                n = self._normal(ia, ib, ic)
-                a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-                f.write(f"  facet normal {n[0]:.6e} {n[1]:.6e} {n[2]:.6e}\n")
-                f.write("    outer loop\n")
-                f.write(f"      vertex {a[0]:.6e} {a[1]:.6e} {a[2]:.6e}\n")
-                f.write(f"      vertex {b[0]:.6e} {b[1]:.6e} {b[2]:.6e}\n")
-                f.write(f"      vertex {c[0]:.6e} {c[1]:.6e} {c[2]:.6e}\n")
-                f.write("    endloop\n  endfacet\n")
-            f.write("endsolid gauntlet\n")
-        kb = os.path.getsize(path) // 1024
-        print(f"  STL: {len(self.tris)} tris, {kb} KB -> {path}")
-
-    def save_3mf(self, path):
-        vlines = [f'          <vertex x="{x}" y="{y}" z="{z}"/>'
-                  for x, y, z in self.verts]
-        tlines = [f'          <triangle v1="{a}" v2="{b}" v3="{c}"/>'
-                  for a, b, c in self.tris]
-        model_xml = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<model unit="millimeter" '
-            'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
-            '  <metadata name="Application">GauntletGen</metadata>\n'
-            '  <resources>\n'
-            '    <object id="1" type="model">\n'
-            '      <mesh>\n'
-            '        <vertices>\n' + '\n'.join(vlines) + '\n'
-            '        </vertices>\n'
-            '        <triangles>\n' + '\n'.join(tlines) + '\n'
-            '        </triangles>\n'
-            '      </mesh>\n'
-            '    </object>\n'
-            '  </resources>\n'
-            '  <build>\n'
-            '    <item objectid="1"/>\n'
-            '  </build>\n'
-            '</model>'
-        )
-        content_types = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
-            '  <Default Extension="rels" ContentType='
-            '"application/vnd.openxmlformats-package.relationships+xml"/>\n'
-            '  <Default Extension="model" ContentType='
-            '"application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
-            '</Types>'
-        )
-        rels = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<Relationships xmlns='
-            '"http://schemas.openxmlformats.org/package/2006/relationships">\n'
-            '  <Relationship Target="/3D/3dmodel.model" Id="rel0" '
-            'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
-            '</Relationships>'
-        )
-        slicer_cfg = (
-            '; Gauntlet tree supports\n'
-            'enable_support = 1\n'
-            'support_type = tree(auto)\n'
-            'support_on_build_plate_only = 0\n'
-            'support_threshold_angle = 30\n'
-        )
-        # Bambu Studio reads print settings from Metadata/plate_1.config
-        plate_cfg = (
-            '; plate config\n'
-            'enable_support = 1\n'
-            'support_type = tree(auto)\n'
-            'support_on_build_plate_only = 0\n'
-            'support_threshold_angle = 30\n'
-        )
-        # Bambu project config
-        project_cfg = (
-            '; project config\n'
-            'enable_support = 1\n'
-            'support_type = tree(auto)\n'
-            'support_on_build_plate_only = 0\n'
-            'support_threshold_angle = 30\n'
-        )
-        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr('[Content_Types].xml', content_types)
-            zf.writestr('_rels/.rels', rels)
-            zf.writestr('3D/3dmodel.model', model_xml)
-            zf.writestr('Metadata/Slic3r_PE.config', slicer_cfg)
-            zf.writestr('Metadata/plate_1.config', plate_cfg)
-            zf.writestr('Metadata/project_config.config', project_cfg)
-        kb = os.path.getsize(path) // 1024
-        print(f"  3MF: {len(self.tris)} tris, {kb} KB -> {path}")
+class Mesh(mesh_core.Mesh):
+    APP = "GauntletGen"
 
 
 def hollow_tube(m, profiles, segs=32, palm_cut_start=None, palm_cut_end=None,
@@ -167,119 +72,80 @@ def hollow_tube(m, profiles, segs=32, palm_cut_start=None, palm_cut_end=None,
 
     The tube is an elliptical cylinder. At each Y slice the cross-section
     is an elliptical annulus (outer ellipse - inner ellipse).
+
+    Everything is built as arrays: one vertex grid (slice, outer/inner,
+    segment) and the faces by index arithmetic, added with one
+    add_geometry() call.  Returns (outer, inner) ring arrays, each
+    (slices, segs, 3).
     """
-    # Which angular range to keep. Full circle = 0 to 2*pi.
-    # For palm cutout, we skip some segments at the bottom (angle ~= 3*pi/2 area).
+    p = np.asarray(profiles, np.float64).reshape(-1, 4)
+    y, rx, rz, wall = p.T
+    n = len(p)
+
+    # All rings in one broadcast: axis 1 is outer (0) / inner (1)
+    radii = np.stack([np.stack([rx, rz], 1),
+                      np.maximum(1.0, np.stack([rx, rz], 1) - wall[:, None])], 1)
+    circle = mesh_prims.unit_circle(segs)
+    rings = np.empty((n, 2, segs, 3))
+    rings[..., 0] = radii[:, :, None, 0] * circle[:, 0]
+    rings[..., 1] = y[:, None, None]
+    rings[..., 2] = radii[:, :, None, 1] * circle[:, 1]
+
+    # Palm cutout: a symmetric arc centred on the bottom of the tube
     # Angle 0 = right (+X), pi/2 = top (+Z), pi = left (-X), 3*pi/2 = bottom (-Z)
-
-    def ring(y, rx_o, rz_o, wall):
-        rx_i = max(1.0, rx_o - wall)
-        rz_i = max(1.0, rz_o - wall)
-        outer = []
-        inner = []
-        for i in range(segs):
-            a = 2.0 * math.pi * i / segs
-            ca, sa = math.cos(a), math.sin(a)
-            outer.append((rx_o * ca, y, rz_o * sa))
-            inner.append((rx_i * ca, y, rz_i * sa))
-        return outer, inner
-
-    # Determine which segments to skip for palm cutout
-    # Bottom of the tube is at angle 3*pi/2 (270 degrees) = -Z direction
-    # We cut a symmetric arc centered at the bottom
-    palm_cut_segs = set()
+    seg_cut = np.zeros(segs, bool)
+    row_cut = np.zeros(n, bool)
     if palm_cut_start is not None:
-        cut_half = math.radians(palm_cut_arc) / 2.0
-        center_angle = 3.0 * math.pi / 2.0  # bottom
-        for i in range(segs):
-            a = 2.0 * math.pi * i / segs
-            # Angle distance to bottom center
-            diff = abs(a - center_angle)
-            if diff > math.pi:
-                diff = 2 * math.pi - diff
-            if diff < cut_half:
-                palm_cut_segs.add(i)
-
-    # Generate all rings
-    slices = []
-    for p in profiles:
-        y, rx, rz, w = p
-        slices.append(ring(y, rx, rz, w))
-
-    def in_palm_cut(yi, si):
-        """Check if this segment should be cut out for palm."""
-        if palm_cut_start is None:
-            return False
-        y = profiles[yi][0]
-        return palm_cut_start <= y <= palm_cut_end and si in palm_cut_segs
-
-    # Build tube walls between adjacent Y slices
-    for yi in range(len(slices) - 1):
-        o1, i1 = slices[yi]
-        o2, i2 = slices[yi + 1]
-
-        for si in range(segs):
-            si_next = (si + 1) % segs
-
-            # Check if this quad or the next is in the palm cutout
-            cut1 = in_palm_cut(yi, si) or in_palm_cut(yi, si_next)
-            cut2 = in_palm_cut(yi + 1, si) or in_palm_cut(yi + 1, si_next)
-
-            if cut1 and cut2:
-                continue  # fully in cutout, skip
-
-            # Outer surface (normals point outward)
-            m.quad(o1[si], o2[si], o2[si_next], o1[si_next])
-            # Inner surface (normals point inward = toward arm)
-            m.quad(i1[si], i1[si_next], i2[si_next], i2[si])
+        a = 2.0 * np.pi * np.arange(segs) / segs
+        diff = np.abs(a - 3.0 * np.pi / 2.0)
+        diff = np.where(diff > np.pi, 2 * np.pi - diff, diff)
+        seg_cut = diff < math.radians(palm_cut_arc) / 2.0
+        row_cut = (palm_cut_start <= y) & (y <= palm_cut_end)
+
+    # cut[yi, si]: quad column si at slice yi touches the cutout
+    si = np.arange(segs)
+    sn = (si + 1) % segs
+    cut = row_cut[:, None] & (seg_cut[si] | seg_cut[sn])
+
+    def idx(yi, layer, s):
+        return (yi * 2 + layer) * segs + s
+
+    def quads(a, b, c, d):
+        return np.stack([a, b, c, a, c, d], -1).reshape(-1, 2, 3)
+
+    # Tube walls: outer quad then inner quad per (slice, segment)
+    yi = np.arange(n - 1)[:, None]
+    walls = np.stack([
+        quads(idx(yi, 0, si), idx(yi + 1, 0, si), idx(yi + 1, 0, sn), idx(yi, 0, sn)),
+        quads(idx(yi, 1, si), idx(yi, 1, sn), idx(yi + 1, 1, sn), idx(yi + 1, 1, si)),
+    ], 1).reshape(n - 1, segs, 4, 3)
+    faces = [walls[~(cut[:-1] & cut[1:])]]
 
     # End caps (annular rings at each end)
-    # Front cap (first Y slice)
-    o_f, i_f = slices[0]
-    for si in range(segs):
-        si_next = (si + 1) % segs
-        if not (in_palm_cut(0, si) or in_palm_cut(0, si_next)):
-            m.quad(o_f[si], i_f[si], i_f[si_next], o_f[si_next])
-
-    # Back cap (last Y slice)
-    o_b, i_b = slices[-1]
-    last_yi = len(slices) - 1
-    for si in range(segs):
-        si_next = (si + 1) % segs
-        if not (in_palm_cut(last_yi, si) or in_palm_cut(last_yi, si_next)):
-            m.quad(o_b[si], o_b[si_next], i_b[si_next], i_b[si])
-
-    # Palm cutout edges: where the cutout starts/ends along Y,
-    # seal the edges with wall strips
+    front = quads(idx(0, 0, si), idx(0, 1, si), idx(0, 1, sn), idx(0, 0, sn))
+    back = quads(idx(n - 1, 0, si), idx(n - 1, 0, sn), idx(n - 1, 1, sn), idx(n - 1, 1, si))
+    faces += [front[~cut[0]], back[~cut[-1]]]
+
+    # Palm cutout edges: seal the Y-direction edges of the cut with
+    # wall strips wherever both slices are inside the cut zone
     if palm_cut_start is not None:
-        # Find the boundary segments (edge of cutout)
-        cut_edges = []
-        for si in range(segs):
-            if si in palm_cut_segs:
-                si_prev = (si - 1) % segs
-                si_next = (si + 1) % segs
-                if si_prev not in palm_cut_segs:
-                    cut_edges.append(si)  # left edge of cut
-                if si_next not in palm_cut_segs:
-                    cut_edges.append(si_next)  # right edge of cut
-
-        # Seal the Y-direction edges of the palm cutout
-        for yi in range(len(slices) - 1):
-            y1 = profiles[yi][0]
-            y2 = profiles[yi + 1][0]
-            o1, i1 = slices[yi]
-            o2, i2 = slices[yi + 1]
-
-            in1 = palm_cut_start <= y1 <= palm_cut_end
-            in2 = palm_cut_start <= y2 <= palm_cut_end
-
-            if in1 and in2:
-                # Both slices in the cut zone - seal the circumferential edges
-                for edge_si in cut_edges:
-                    if edge_si < segs:
-                        m.quad(o1[edge_si], o2[edge_si], i2[edge_si], i1[edge_si])
-
-    return slices
+        left = seg_cut & ~np.roll(seg_cut, 1)      # first segment of the cut
+        right = seg_cut & ~seg_cut[sn]             # last segment of the cut
+        edges = np.stack([np.where(left, si, -1), np.where(right, sn, -1)], 1).ravel()
+        edges = edges[edges >= 0]
+        rows = np.flatnonzero(row_cut[:-1] & row_cut[1:])[:, None]
+        faces.append(quads(idx(rows, 0, edges), idx(rows + 1, 0, edges),
+                           idx(rows + 1, 1, edges), idx(rows, 1, edges)))
+
+    faces = np.concatenate([f.reshape(-1, 3) for f in faces])
+    # Number the vertices in the order the faces first use them (what
+    # welding quad() corners would give) and drop any the cut left unused
+    used, first = np.unique(faces, return_index=True)
+    order = used[np.argsort(first)]
+    remap = np.empty(len(rings.reshape(-1, 3)), np.int64)
+    remap[order] = np.arange(len(order))
+    m.add_geometry(rings.reshape(-1, 3)[order], remap[faces])
+    return rings[:, 0], rings[:, 1]
 
 
 def box(m, x0, y0, z0, x1, y1, z1):
@@ -342,6 +208,8 @@ def generate():
         -hand_rx - 5,   last_y,   -hand_rz - 5,      # x0, y0, z0
          hand_rx + 5,   last_y + plate_thick,   hand_rz + 10)  # x1, y1, z1
 
+    if DECIMATE_RMS is not None:
+        m.decimate(max_rms=DECIMATE_RMS)
     return m
 
 
@@ -351,13 +219,14 @@ if __name__ == '__main__':
     print("=" * 55)
     print()
 
-    m = generate()
     base = os.path.dirname(os.path.abspath(__file__))
+    m = mesh_cache.cached_build(generate, mesh_cache.cache_dir_for(base))
 
     stl_path = os.path.join(base, OUTPUT_STL)
     m.save_stl(stl_path)
     mf_path = os.path.join(base, OUTPUT_3MF)
-    m.save_3mf(mf_path)
+    m.save_3mf(mf_path, extra=SLICER_CONFIG)
+    m.check()
 
     print(f"\n  Verts: {len(m.verts)}  Tris: {len(m.tris)}")
     print()
@@ -11,9 +11,10 @@ Clean 2x6 brick with:
 
 Chain bricks:  Brick A RIGHT peg -> Brick B LEFT socket -> spins!
 """
-import math
-import os
-import zipfile
+
+import mesh_cache
+import mesh_core
+import mesh_prims
 
 # ── Real LEGO Dimensions (mm) ──
 # Tuned for 3D printing (FDM, 0.4mm nozzle) that snaps onto real LEGO bricks.
@@ -26,7 +27,6 @@ ROWS      = 2
 BRICK_H   = 9.6       # Standard brick body height (= 3 plates × 3.2mm)
 STUD_D    = 4.8 - PRINT_TOL * 3   # Real LEGO = 4.8mm; shrink more for FDM (layer lines add width)
 STUD_H    = 1.8       # Real LEGO stud height (was 1.7)
-SEGS      = 32        # More segments = smoother cylinders for better fit
 WALL      = 1.5       # Side wall thickness (LEGO standard)
 TOP_WALL  = 1.0       # Top plate thickness (LEGO standard)
 TUBE_OD   = 6.51      # Anti-stud tube outer diameter (LEGO standard, creates clutch)
@@ -49,27 +49,9 @@ BODY_X = COLS * PITCH - TOL * 2
 BODY_Z = ROWS * PITCH - TOL * 2
 
 
-class Mesh:
-    """Indexed triangle mesh with vertex dedup."""
-    def __init__(self):
-        self.verts = []
-        self.tris = []
-        self._vmap = {}
-
-    def v(self, x, y, z):
-        key = (round(x, 4), round(y, 4), round(z, 4))
-        if key not in self._vmap:
-            self._vmap[key] = len(self.verts)
-            self.verts.append(key)
-        return self._vmap[key]
-
-    def tri(self, a, b, c):
-        ia, ib, ic = self.v(*a), self.v(*b), self.v(*c)
-        if ia != ib and ib != ic and ia != ic:
-            self.tris.append((ia, ib, ic))
-
-    def quad(self, a, b, c, d):
-        self.tri(a, b, c); self.tri(a, c, d)
+class Mesh(mesh_core.Mesh):
+    """Shared mesh core plus LEGO primitives."""
+    APP = "LegoGen"
 
     def box(self, x0, y0, z0, x1, y1, z1):
         a,b,c,d = (x0,y0,z0),(x1,y0,z0),(x1,y0,z1),(x0,y0,z1)
@@ -78,138 +60,30 @@ class Mesh:
         self.quad(a,b,f,e); self.quad(c,d,h,g)
         self.quad(a,e,h,d); self.quad(b,c,g,f)
 
-    def cyl_y(self, cx, y0, cz, r, h, segs=SEGS):
+    def cyl_y(self, cx, y0, cz, r, h, segs=None):
         """Cylinder along Y (for top studs)."""
-        bot, top = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            px, pz = cx+r*math.cos(a), cz+r*math.sin(a)
-            bot.append((px, y0, pz)); top.append((px, y0+h, pz))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(bot[i], bot[j], top[j], top[i])
-        ct = (cx, y0+h, cz)
-        cb = (cx, y0, cz)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ct, top[i], top[j])
-            self.tri(cb, bot[j], bot[i])
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, h, segs), (cx, y0, cz), 'y')
 
-    def cyl_x(self, x0, cy, cz, r, l, segs=SEGS):
+    def cyl_x(self, x0, cy, cz, r, l, segs=None):
         """Cylinder along X (for hinge pegs)."""
-        s, e = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            py, pz = cy+r*math.cos(a), cz+r*math.sin(a)
-            s.append((x0, py, pz)); e.append((x0+l, py, pz))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(s[i], s[j], e[j], e[i])
-        cs = (x0, cy, cz); ce = (x0+l, cy, cz)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ce, e[i], e[j])
-            self.tri(cs, s[j], s[i])
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, l, segs), (x0, cy, cz), 'x')
 
-    def cyl_z(self, cx, cy, z0, r, l, segs=SEGS):
+    def cyl_z(self, cx, cy, z0, r, l, segs=None):
         """Cylinder along Z (for side studs)."""
-        s, e = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            px, py = cx+r*math.cos(a), cy+r*math.sin(a)
-            s.append((px, py, z0)); e.append((px, py, z0+l))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(s[i], s[j], e[j], e[i])
-        cs = (cx, cy, z0); ce = (cx, cy, z0+l)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ce, e[i], e[j])
-            self.tri(cs, s[j], s[i])
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, l, segs), (cx, cy, z0), 'z')
 
-    def tube_x(self, x0, cy, cz, ro, ri, l, segs=SEGS):
+    def tube_x(self, x0, cy, cz, ro, ri, l, segs=None):
         """Hollow tube along X (for hinge sockets)."""
-        os_, oe, is_, ie = [], [], [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            ca, sa = math.cos(a), math.sin(a)
-            os_.append((x0, cy+ro*ca, cz+ro*sa))
-            oe.append((x0+l, cy+ro*ca, cz+ro*sa))
-            is_.append((x0, cy+ri*ca, cz+ri*sa))
-            ie.append((x0+l, cy+ri*ca, cz+ri*sa))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(os_[i], os_[j], oe[j], oe[i])
-            self.quad(is_[j], is_[i], ie[i], ie[j])
-            self.quad(oe[i], oe[j], ie[j], ie[i])
-            self.quad(os_[j], os_[i], is_[i], is_[j])
+        segs = segs or self.segs_for(ro)
+        self.add_instances(mesh_prims.tube(ro, ri, l, segs), (x0, cy, cz), 'x')
 
-    def tube_y(self, cx, y0, cz, ro, ri, h, segs=SEGS):
+    def tube_y(self, cx, y0, cz, ro, ri, h, segs=None):
         """Hollow tube along Y (for anti-studs)."""
-        ob, ot, ib, it = [], [], [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            ca, sa = math.cos(a), math.sin(a)
-            ob.append((cx+ro*ca, y0, cz+ro*sa))
-            ot.append((cx+ro*ca, y0+h, cz+ro*sa))
-            ib.append((cx+ri*ca, y0, cz+ri*sa))
-            it.append((cx+ri*ca, y0+h, cz+ri*sa))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(ob[i], ob[j], ot[j], ot[i])
-            self.quad(ib[j], ib[i], it[i], it[j])
-            self.quad(ot[i], ot[j], it[j], it[i])
-            self.quad(ob[j], ob[i], ib[i], ib[j])
-
-    def _normal(self, ia, ib, ic):
-        a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-        ux,uy,uz = b[0]-a[0], b[1]-a[1], b[2]-a[2]
-        vx,vy,vz = c[0]-a[0], c[1]-a[1], c[2]-a[2]
-        nx,ny,nz = uy*vz-uz*vy, uz*vx-ux*vz, ux*vy-uy*vx
-        ln = math.sqrt(nx*nx+ny*ny+nz*nz)
-        return (nx/ln, ny/ln, nz/ln) if ln > 1e-12 else (0,0,1)
-
-    def save_stl(self, path):
-        with open(path, 'w') as f:
-            f.write("solid lego\n")
-            for ia,ib,ic in self.tris:
-                n = self._normal(ia,ib,ic)
-                a,b,c = self.verts[ia], self.verts[ib], self.verts[ic]
-                f.write(f"  facet normal {n[0]:.6e} {n[1]:.6e} {n[2]:.6e}\n")
-                f.write("    outer loop\n")
-                for p in (a,b,c):
-                    f.write(f"      vertex {p[0]:.6e} {p[1]:.6e} {p[2]:.6e}\n")
-                f.write("    endloop\n  endfacet\n")
-            f.write("endsolid lego\n")
-        print(f"  STL: {len(self.tris)} tris, {os.path.getsize(path)//1024} KB -> {path}")
-
-    def save_3mf(self, path):
-        vl = [f'          <vertex x="{x}" y="{y}" z="{z}"/>' for x,y,z in self.verts]
-        tl = [f'          <triangle v1="{a}" v2="{b}" v3="{c}"/>' for a,b,c in self.tris]
-        model = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
-            '  <metadata name="Application">LegoGen</metadata>\n'
-            '  <resources>\n    <object id="1" type="model">\n      <mesh>\n'
-            '        <vertices>\n'+'\n'.join(vl)+'\n        </vertices>\n'
-            '        <triangles>\n'+'\n'.join(tl)+'\n        </triangles>\n'
-            '      </mesh>\n    </object>\n  </resources>\n'
-            '  <build>\n    <item objectid="1"/>\n  </build>\n</model>')
-        ct = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-              '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
-              '  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
-              '  <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
-              '</Types>')
-        rels = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
-                '  <Relationship Target="/3D/3dmodel.model" Id="rel0" '
-                'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
-                '</Relationships>')
-        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr('[Content_Types].xml', ct)
-            zf.writestr('_rels/.rels', rels)
-            zf.writestr('3D/3dmodel.model', model)
-        print(f"  3MF: {len(self.tris)} tris, {os.path.getsize(path)//1024} KB -> {path}")
+        segs = segs or self.segs_for(ro)
+        self.add_instances(mesh_prims.tube(ro, ri, h, segs), (cx, y0, cz), 'y')
 
 
 # ==================================================================
@@ -226,27 +100,26 @@ def build_lego_2x6():
     m.box(0, 0, WALL, WALL, BRICK_H - TOP_WALL, BODY_Z - WALL)      # left wall
     m.box(BODY_X-WALL, 0, WALL, BODY_X, BRICK_H-TOP_WALL, BODY_Z-WALL)  # right wall
 
+    # One stud template, stamped at every stud position below
+    stud = mesh_prims.solid_cylinder(sr, STUD_H, m.segs_for(sr))
+
     # ── 2. TOP STUDS (2x6 grid) ──
-    for col in range(COLS):
-        for row in range(ROWS):
-            m.cyl_y(PITCH/2 + col*PITCH - TOL, BRICK_H,
-                    PITCH/2 + row*PITCH - TOL, sr, STUD_H)
+    m.add_instances(stud, [(PITCH/2 + col*PITCH - TOL, BRICK_H, PITCH/2 + row*PITCH - TOL)
+                           for col in range(COLS) for row in range(ROWS)], 'y')
 
     # ── 3. ANTI-STUD TUBES (underneath) ──
     tro, tri_ = TUBE_OD/2, TUBE_ID/2
     th = BRICK_H - TOP_WALL
-    for col in range(COLS - 1):
-        m.tube_y(PITCH + col*PITCH - TOL, 0, cz, tro, tri_, th)
+    m.add_instances(mesh_prims.tube(tro, tri_, th, m.segs_for(tro)),
+                    [(PITCH + col*PITCH - TOL, 0, cz) for col in range(COLS - 1)], 'y')
 
     # ── 4. SIDE STUDS (front and back walls) ──
     # Studs on the long side walls so bricks can attach sideways (SNOT building)
     side_cy = BRICK_H / 2   # vertically centered on wall
-    for col in range(COLS):
-        sx = PITCH/2 + col*PITCH - TOL
-        # Front wall studs (pointing -Z)
-        m.cyl_z(sx, side_cy, -STUD_H, sr, STUD_H)
-        # Back wall studs (pointing +Z)
-        m.cyl_z(sx, side_cy, BODY_Z, sr, STUD_H)
+    sxs = [PITCH/2 + col*PITCH - TOL for col in range(COLS)]
+    # Front wall studs (pointing -Z), back wall studs (pointing +Z)
+    m.add_instances(stud, [(sx, side_cy, -STUD_H) for sx in sxs]
+                          + [(sx, side_cy, BODY_Z) for sx in sxs], 'z')
 
     # ==============================================================
     #  5. HINGE PEG — flush on RIGHT end wall
@@ -276,8 +149,9 @@ def build_lego_2x6():
 
 
 if __name__ == "__main__":
-    m = build_lego_2x6()
+    m = mesh_cache.cached_build(build_lego_2x6, mesh_cache.cache_dir_for("lego_2x6.stl"))
     m.save_stl("lego_2x6.stl")
     m.save_3mf("lego_2x6.3mf")
+    m.check()
     print("\nDone! Clean hinge brick.")
     print("Peg on right end, socket on left end.")
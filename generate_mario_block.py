@@ -8,9 +8,13 @@ Mario ? Block — LEGO Compatible
   - Hollow interior with walls
   - LEGO-compatible stud/anti-stud dimensions
 """
-import math
 import os
-import zipfile
+
+import mesh_cache
+import mesh_core
+import mesh_io
+import mesh_parts
+import mesh_prims
 
 # ── LEGO Dimensions (mm) ──
 PRINT_TOL = 0.1
@@ -19,7 +23,6 @@ GRID      = 8            # 8×8×8 studs
 CUBE_SIZE = GRID * PITCH # 64mm
 STUD_D    = 4.8 - PRINT_TOL * 3  # Stud diameter (shrunk for FDM)
 STUD_H    = 1.8          # Stud height
-SEGS      = 32           # Cylinder smoothness
 WALL      = 1.5          # Wall thickness
 TOP_WALL  = 1.0          # Top plate thickness
 TUBE_OD   = 6.51         # Anti-stud tube outer diameter
@@ -44,27 +47,9 @@ QUESTION_MARK = [
 ]
 
 
-class Mesh:
-    """Indexed triangle mesh with vertex dedup."""
-    def __init__(self):
-        self.verts = []
-        self.tris = []
-        self._vmap = {}
-
-    def v(self, x, y, z):
-        key = (round(x, 4), round(y, 4), round(z, 4))
-        if key not in self._vmap:
-            self._vmap[key] = len(self.verts)
-            self.verts.append(key)
-        return self._vmap[key]
-
-    def tri(self, a, b, c):
-        ia, ib, ic = self.v(*a), self.v(*b), self.v(*c)
-        if ia != ib and ib != ic and ia != ic:
-            self.tris.append((ia, ib, ic))
-
-    def quad(self, a, b, c, d):
-        self.tri(a, b, c); self.tri(a, c, d)
+class Mesh(mesh_core.Mesh):
+    """Shared mesh core plus LEGO primitives."""
+    APP = "MarioBlockGen"
 
     def box(self, x0, y0, z0, x1, y1, z1):
         a, b, c, d = (x0,y0,z0),(x1,y0,z0),(x1,y0,z1),(x0,y0,z1)
@@ -73,192 +58,84 @@ class Mesh:
         self.quad(a,b,f,e); self.quad(c,d,h,g)
         self.quad(a,e,h,d); self.quad(b,c,g,f)
 
-    def cyl_y(self, cx, y0, cz, r, h, segs=SEGS):
+    def cyl_y(self, cx, y0, cz, r, h, segs=None):
         """Cylinder along Y (top studs)."""
-        bot, top = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            px, pz = cx+r*math.cos(a), cz+r*math.sin(a)
-            bot.append((px, y0, pz)); top.append((px, y0+h, pz))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(bot[i], bot[j], top[j], top[i])
-        ct, cb = (cx, y0+h, cz), (cx, y0, cz)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ct, top[i], top[j])
-            self.tri(cb, bot[j], bot[i])
-
-    def cyl_z(self, cx, cy, z0, r, l, segs=SEGS):
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, h, segs), (cx, y0, cz), 'y')
+
+    def cyl_z(self, cx, cy, z0, r, l, segs=None):
         """Cylinder along Z (front/back wall studs)."""
-        s, e = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            px, py = cx+r*math.cos(a), cy+r*math.sin(a)
-            s.append((px, py, z0)); e.append((px, py, z0+l))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(s[i], s[j], e[j], e[i])
-        cs, ce = (cx, cy, z0), (cx, cy, z0+l)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ce, e[i], e[j])
-            self.tri(cs, s[j], s[i])
-
-    def cyl_x(self, x0, cy, cz, r, l, segs=SEGS):
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, l, segs), (cx, cy, z0), 'z')
+
+    def cyl_x(self, x0, cy, cz, r, l, segs=None):
         """Cylinder along X (left/right wall studs)."""
-        s, e = [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            py, pz = cy+r*math.cos(a), cz+r*math.sin(a)
-            s.append((x0, py, pz)); e.append((x0+l, py, pz))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(s[i], s[j], e[j], e[i])
-        cs, ce = (x0, cy, cz), (x0+l, cy, cz)
-        for i in range(segs):
-            j = (i+1) % segs
-            self.tri(ce, e[i], e[j])
-            self.tri(cs, s[j], s[i])
-
-    def tube_y(self, cx, y0, cz, ro, ri, h, segs=SEGS):
+        segs = segs or self.segs_for(r)
+        self.add_instances(mesh_prims.solid_cylinder(r, l, segs), (x0, cy, cz), 'x')
+
+    def tube_y(self, cx, y0, cz, ro, ri, h, segs=None):
         """Hollow tube along Y (anti-studs)."""
-        ob, ot, ib, it_ = [], [], [], []
-        for i in range(segs):
-            a = 2*math.pi*i/segs
-            ca, sa = math.cos(a), math.sin(a)
-            ob.append((cx+ro*ca, y0, cz+ro*sa))
-            ot.append((cx+ro*ca, y0+h, cz+ro*sa))
-            ib.append((cx+ri*ca, y0, cz+ri*sa))
-            it_.append((cx+ri*ca, y0+h, cz+ri*sa))
-        for i in range(segs):
-            j = (i+1) % segs
-            self.quad(ob[i], ob[j], ot[j], ot[i])
-            self.quad(ib[j], ib[i], it_[i], it_[j])
-            self.quad(ot[i], ot[j], it_[j], it_[i])
-            self.quad(ob[j], ob[i], ib[i], ib[j])
-
-    def _normal(self, ia, ib, ic):
-        a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-        ux, uy, uz = b[0]-a[0], b[1]-a[1], b[2]-a[2]
-        vx, vy, vz = c[0]-a[0], c[1]-a[1], c[2]-a[2]
-        nx, ny, nz = uy*vz-uz*vy, uz*vx-ux*vz, ux*vy-uy*vx
-        ln = math.sqrt(nx*nx+ny*ny+nz*nz)
-        return (nx/ln, ny/ln, nz/ln) if ln > 1e-12 else (0, 0, 1)
-
-    def save_stl(self, path):
-        with open(path, 'w') as f:
-            f.write("solid mario_block\n")
-            for ia, ib, ic in self.tris:
-                n = self._normal(ia, ib, ic)
-                a, b, c = self.verts[ia], self.verts[ib], self.verts[ic]
-                f.write(f"  facet normal {n[0]:.6e} {n[1]:.6e} {n[2]:.6e}\n")
-                f.write("    outer loop\n")
-                for p in (a, b, c):
-                    f.write(f"      vertex {p[0]:.6e} {p[1]:.6e} {p[2]:.6e}\n")
-                f.write("    endloop\n  endfacet\n")
-            f.write("endsolid mario_block\n")
-        print(f"  STL: {len(self.tris)} tris, {os.path.getsize(path)//1024} KB -> {path}")
-
-    def save_3mf(self, path):
-        vl = [f'          <vertex x="{x}" y="{y}" z="{z}"/>' for x, y, z in self.verts]
-        tl = [f'          <triangle v1="{a}" v2="{b}" v3="{c}"/>' for a, b, c in self.tris]
-        model = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
-            '  <metadata name="Application">MarioBlockGen</metadata>\n'
-            '  <resources>\n    <object id="1" type="model">\n      <mesh>\n'
-            '        <vertices>\n' + '\n'.join(vl) + '\n        </vertices>\n'
-            '        <triangles>\n' + '\n'.join(tl) + '\n        </triangles>\n'
-            '      </mesh>\n    </object>\n  </resources>\n'
-            '  <build>\n    <item objectid="1"/>\n  </build>\n</model>')
-        ct = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-              '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
-              '  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
-              '  <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
-              '</Types>')
-        rels = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
-                '  <Relationship Target="/3D/3dmodel.model" Id="rel0" '
-                'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
-                '</Relationships>')
-        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr('[Content_Types].xml', ct)
-            zf.writestr('_rels/.rels', rels)
-            zf.writestr('3D/3dmodel.model', model)
-        print(f"  3MF: {len(self.tris)} tris, {os.path.getsize(path)//1024} KB -> {path}")
-
-
-def save_multicolor_3mf(meshes, colors, path):
+        segs = segs or self.segs_for(ro)
+        self.add_instances(mesh_prims.tube(ro, ri, h, segs), (cx, y0, cz), 'y')
+
+
+def save_multicolor_3mf(meshes, colors, path, weld_seams=True):
     """Save multiple meshes as ONE object with per-triangle material colors in 3MF.
     meshes = [(mesh, name), ...]
-    colors = [(r,g,b), ...] — one color per mesh, hex RGB."""
-    # Merge all meshes into one vertex/triangle list, tagging each triangle with material ID
-    all_verts = []
-    all_tris = []  # (v1, v2, v3, material_id)
-    vmap = {}
-    
-    def add_vert(x, y, z):
-        key = (round(x, 4), round(y, 4), round(z, 4))
-        if key not in vmap:
-            vmap[key] = len(all_verts)
-            all_verts.append(key)
-        return vmap[key]
-    
-    for mat_id, (mesh, name) in enumerate(meshes):
-        for ia, ib, ic in mesh.tris:
-            a = mesh.verts[ia]
-            b = mesh.verts[ib]
-            c = mesh.verts[ic]
-            va = add_vert(*a)
-            vb = add_vert(*b)
-            vc = add_vert(*c)
-            all_tris.append((va, vb, vc, mat_id))
-
-    # Build materials
-    mat_lines = []
-    for i, (r, g, b) in enumerate(colors):
-        mat_lines.append(f'          <base name="Color{i}" displaycolor="#{r:02X}{g:02X}{b:02X}"/>')
-
-    vl = [f'          <vertex x="{x}" y="{y}" z="{z}"/>' for x, y, z in all_verts]
-    tl = [f'          <triangle v1="{a}" v2="{b}" v3="{c}" pid="1" p1="{m}"/>' for a, b, c, m in all_tris]
-
-    model = (
-        '<?xml version="1.0" encoding="UTF-8"?>\n'
-        '<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02"\n'
-        '       xmlns:m="http://schemas.microsoft.com/3dmanufacturing/material/2015/02">\n'
-        '  <metadata name="Application">MarioBlockGen</metadata>\n'
-        '  <resources>\n'
-        '    <basematerials id="1">\n' + '\n'.join(mat_lines) + '\n    </basematerials>\n'
-        '    <object id="2" type="model" name="MarioQuestionBlock">\n'
-        '      <mesh>\n'
-        '        <vertices>\n' + '\n'.join(vl) + '\n        </vertices>\n'
-        '        <triangles>\n' + '\n'.join(tl) + '\n        </triangles>\n'
-        '      </mesh>\n'
-        '    </object>\n'
-        '  </resources>\n'
-        '  <build>\n    <item objectid="2"/>\n  </build>\n'
-        '</model>')
-    ct = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-          '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
-          '  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
-          '  <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
-          '</Types>')
-    rels = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
-            '  <Relationship Target="/3D/3dmodel.model" Id="rel0" '
-            'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
-            '</Relationships>')
-    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr('[Content_Types].xml', ct)
-        zf.writestr('_rels/.rels', rels)
-        zf.writestr('3D/3dmodel.model', model)
-    print(f"  3MF (multi-color): {len(all_tris)} tris, {len(colors)} colors, {os.path.getsize(path)//1024} KB -> {path}")
+    colors = [(r,g,b), ...] — one color per mesh, hex RGB.
+    The meshes' arrays are joined with index offsets and each face tagged
+    with its mesh's material id; weld_seams merges vertices where they touch.
+    Skipped if `path` already holds exactly this content (see mesh_cache)."""
+    verts, faces, mat = mesh_core.join_meshes([(mesh.verts, mesh.tris) for mesh, _ in meshes],
+                                              Mesh.WELD_EPS if weld_seams else None)
+    key = mesh_cache.content_key(verts, faces, '3mf', Mesh.APP, "MarioQuestionBlock",
+                                 colors, arrays=[mat])
+    note = "  (unchanged)"
+    if not mesh_cache.output_current(path, key):
+        mesh_io.write_3mf(path, verts, faces,
+                          app=Mesh.APP, name="MarioQuestionBlock",
+                          materials=colors, face_material=mat)
+        mesh_cache.record_output(path, key)
+        note = ""
+    print(f"  3MF (multi-color): {len(faces)} tris, {len(colors)} colors, {os.path.getsize(path)//1024} KB -> {path}{note}")
+
+
+def _side_studs(m, qmark):
+    """Side studs on all 4 faces: the ? pattern (qmark=True) or the rest."""
+    front, back, left, right = [], [], [], []
+    for row in range(GRID):
+        for col in range(GRID):
+            if (QUESTION_MARK[row][col] == 1) != qmark:
+                continue
 
+            # Y center for this row (row 0 = top)
+            cy = BODY - PITCH/2 - row * PITCH + TOL
 
-def build_mario_block():
-    body = Mesh()   # Yellow body (shell + top studs + anti-studs)
-    qmark = Mesh()  # Brown/dark ? pattern studs (separate color)
+            # Front face (Z = 0, studs point -Z)
+            sx = PITCH/2 + col * PITCH - TOL
+            front.append((sx, cy, -STUD_H))
+
+            # Back face (Z = BODY, studs point +Z) — mirrored
+            sx_back = PITCH/2 + (GRID - 1 - col) * PITCH - TOL
+            back.append((sx_back, cy, BODY))
+
+            # Left face (X = 0, studs point -X)
+            sz = PITCH/2 + col * PITCH - TOL
+            left.append((-STUD_H, cy, sz))
+
+            # Right face (X = BODY, studs point +X) — mirrored
+            sz_right = PITCH/2 + (GRID - 1 - col) * PITCH - TOL
+            right.append((BODY, cy, sz_right))
+
+    # One stud template stamped at every position
+    stud = mesh_prims.solid_cylinder(SR, STUD_H, m.segs_for(SR))
+    m.add_instances(stud, front + back, 'z')
+    m.add_instances(stud, left + right, 'x')
+
+
+def build_body():
+    """Yellow body: shell + top studs + anti-studs + background side studs."""
+    body = Mesh()
 
     # ── 1. SHELL — hollow box, OPEN BOTTOM (no bottom plate) ──
     # Top plate
@@ -273,46 +150,33 @@ def build_mario_block():
     body.box(BODY - WALL, 0, WALL, BODY, BODY - TOP_WALL, BODY - WALL)
 
     # ── 2. TOP STUDS — 8×8 grid (yellow body) ──
-    for col in range(GRID):
-        for row in range(GRID):
-            cx = PITCH/2 + col * PITCH - TOL
-            cz = PITCH/2 + row * PITCH - TOL
-            body.cyl_y(cx, BODY, cz, SR, STUD_H)
+    stud = mesh_prims.solid_cylinder(SR, STUD_H, body.segs_for(SR))
+    body.add_instances(stud, [(PITCH/2 + col * PITCH - TOL, BODY, PITCH/2 + row * PITCH - TOL)
+                              for col in range(GRID) for row in range(GRID)], 'y')
 
     # ── 3. BOTTOM ANTI-STUD TUBES — 7×7 grid (hanging from top plate) ──
     tro, tri_ = TUBE_OD / 2, TUBE_ID / 2
     tube_h = BODY - TOP_WALL  # Tubes hang from top plate all the way down
-    for col in range(GRID - 1):
-        for row in range(GRID - 1):
-            cx = PITCH + col * PITCH - TOL
-            cz = PITCH + row * PITCH - TOL
-            body.tube_y(cx, 0, cz, tro, tri_, tube_h)
-
-    # ── 4. SIDE STUDS — full 8×8 grid on all 4 faces ──
-    # ? pattern studs → qmark mesh (brown), background studs → body mesh (yellow)
-    for row in range(GRID):
-        for col in range(GRID):
-            is_qmark = QUESTION_MARK[row][col] == 1
-            target = qmark if is_qmark else body
+    tube = mesh_prims.tube(tro, tri_, tube_h, body.segs_for(tro))
+    body.add_instances(tube, [(PITCH + col * PITCH - TOL, 0, PITCH + row * PITCH - TOL)
+                              for col in range(GRID - 1) for row in range(GRID - 1)], 'y')
 
-            # Y center for this row (row 0 = top)
-            cy = BODY - PITCH/2 - row * PITCH + TOL
+    # ── 4. SIDE STUDS — background studs (yellow) ──
+    _side_studs(body, qmark=False)
+    return body
 
-            # Front face (Z = 0, studs point -Z)
-            sx = PITCH/2 + col * PITCH - TOL
-            target.cyl_z(sx, cy, -STUD_H, SR, STUD_H)
 
-            # Back face (Z = BODY, studs point +Z) — mirrored
-            sx_back = PITCH/2 + (GRID - 1 - col) * PITCH - TOL
-            target.cyl_z(sx_back, cy, BODY, SR, STUD_H)
+def build_qmark():
+    """Brown/dark ? pattern studs (separate color)."""
+    qmark = Mesh()
+    _side_studs(qmark, qmark=True)
+    return qmark
 
-            # Left face (X = 0, studs point -X)
-            sz = PITCH/2 + col * PITCH - TOL
-            target.cyl_x(-STUD_H, cy, sz, SR, STUD_H)
 
-            # Right face (X = BODY, studs point +X) — mirrored
-            sz_right = PITCH/2 + (GRID - 1 - col) * PITCH - TOL
-            target.cyl_x(BODY, cy, sz_right, SR, STUD_H)
+def build_mario_block():
+    parts = mesh_parts.build_parts({'body': build_body, 'qmark': build_qmark},
+                                   cache_dir=mesh_cache.cache_dir_for("mario_question_block.stl"))
+    body, qmark = parts['body'], parts['qmark']
 
     # ── Summary ──
     side_studs_q = sum(sum(r) for r in QUESTION_MARK)
@@ -330,11 +194,10 @@ if __name__ == "__main__":
     body, qmark = build_mario_block()
     # Single-color STL (everything combined)
     combined = Mesh()
-    combined.verts = body.verts + qmark.verts
-    offset = len(body.verts)
-    combined.tris = body.tris + [(a+offset, b+offset, c+offset) for a, b, c in qmark.tris]
-    combined._vmap = {}  # not needed for save
+    combined.merge(body)
+    combined.merge(qmark)
     combined.save_stl("mario_question_block.stl")
+    combined.check()
     # Multi-color 3MF — single object, per-triangle material colors
     # Yellow (255, 200, 0) for body, Brown (101, 67, 33) for ? pattern
     save_multicolor_3mf(
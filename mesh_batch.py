@@ -0,0 +1,255 @@
+"""
+Mesh Batch — parameter sweeps over the generate_*.py scripts
+=============================================================
+Builds many variants of one generator with different module-level
+constants, in parallel, without editing the script.
+
+    python mesh_batch.py generate_lego.py --set PRINT_TOL=0.0:0.3:0.05
+    python mesh_batch.py generate_spring.py --set COIL_R=6,8,10 --set WIRE_R=1.0,1.5
+
+Each --set NAME=VALUES adds one axis to the grid; the variants are the
+cartesian product of all axes.  VALUES is a comma list (1.0,1.5,"abc")
+or an inclusive start:stop:step range.
+
+How a variant is built:
+  - The script's source is parsed, and the top-level assignments of the
+    overridden names are replaced with the new values in the AST.
+    Derived constants (STUD_D = 4.8 - PRINT_TOL * 3, default arguments,
+    ...) are then computed from the new values, exactly as if the file
+    had been edited.
+  - The rewritten script is saved in the variant's own output directory
+    (batch_out/<script>/<variant>/) and run there by a fresh Python
+    process, so the script's normal main block writes its STL/3MF files
+    next to it.  Its console output goes to run.log in the same
+    directory.
+  - Being a real file run as __main__, the variant works with generators
+    that start their own process pools under any multiprocessing start
+    method: spawned workers re-import the variant, not mesh_batch.
+
+batch_out/<script>/manifest.json lists every variant: parameters,
+output files with triangle counts and sizes, and build time.  A variant
+whose run fails is listed with an 'error'; the manifest is still written
+and the exit status is 1.
+"""
+import argparse
+import ast
+import itertools
+import json
+import os
+import re
+import struct
+import subprocess
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.parsers import expat
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUT_ROOT = os.path.join(HERE, "batch_out")
+
+
+# ── Parameter grid ───────────────────────────────────────────────────────────
+
+def parse_values(text):
+    """'0:0.3:0.1' -> [0, 0.1, 0.2, 0.3];  '1,2,"a"' -> [1, 2, 'a']."""
+    if ':' in text and ',' not in text:
+        start, stop, step = (float(x) for x in text.split(':'))
+        n = int(round((stop - start) / step))
+        return [round(start + i * step, 10) for i in range(n + 1)]
+    return [ast.literal_eval(x.strip()) for x in text.split(',')]
+
+
+def parse_grid(sets):
+    """['A=1,2', 'B=3'] -> [{'A': 1, 'B': 3}, {'A': 2, 'B': 3}]."""
+    axes = []
+    for item in sets:
+        name, _, values = item.partition('=')
+        if not name.isidentifier() or not values:
+            raise ValueError(f"bad --set {item!r}; expected NAME=VALUES")
+        axes.append([(name, v) for v in parse_values(values)])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def variant_name(params):
+    """Filesystem-safe directory name for one parameter set."""
+    if not params:
+        return "default"
+    text = "_".join(f"{k}={v}" for k, v in params.items())
+    return re.sub(r'[^A-Za-z0-9_.=-]', '-', text)
+
+
+# ── Source rewriting ─────────────────────────────────────────────────────────
+
+def override_source(source, params, filename="<generator>"):
+    """`source` with the values of top-level NAME = ... assignments replaced.
+
+    Only the assigned expressions change, so line numbers and comments
+    stay as in the original.  Raises ValueError if a name is not
+    assigned at module level.
+    """
+    tree = ast.parse(source, filename)
+    seen = set()
+    edits = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        names = [t.id for t in targets if isinstance(t, ast.Name)]
+        hit = [n for n in names if n in params]
+        if hit:
+            edits.append((node.value, repr(params[hit[0]])))
+            seen.update(hit)
+    missing = set(params) - seen
+    if missing:
+        raise ValueError(f"{filename}: no module-level constant(s) {sorted(missing)}")
+
+    lines = source.splitlines(keepends=True)
+    for value, text in reversed(edits):
+        # AST offsets are UTF-8 byte columns
+        first = lines[value.lineno - 1].encode()
+        last = lines[value.end_lineno - 1].encode()
+        new = first[:value.col_offset] + text.encode() + last[value.end_col_offset:]
+        lines[value.lineno - 1:value.end_lineno] = [new.decode()]
+    return ''.join(lines)
+
+
+# ── Output inspection ────────────────────────────────────────────────────────
+
+def count_tris(path):
+    """Triangle count of a binary/ASCII STL or a 3MF file (components expanded)."""
+    if path.endswith('.3mf'):
+        # Triangles per object, expanded through <component>s and <item>s;
+        # expat streams the model part without building a tree
+        own, parts, items, obj = {}, {}, [], [None]
+
+        def start(name, attrs):
+            tag = name.rpartition(' ')[2]
+            if tag == 'triangle':
+                own[obj[0]] = own.get(obj[0], 0) + 1
+            elif tag == 'object':
+                obj[0] = attrs.get('id')
+            elif tag == 'component':
+                parts.setdefault(obj[0], []).append(attrs.get('objectid'))
+            elif tag == 'item':
+                items.append(attrs.get('objectid'))
+
+        parser = expat.ParserCreate(namespace_separator=' ')
+        parser.StartElementHandler = start
+        with zipfile.ZipFile(path) as zf, zf.open('3D/3dmodel.model') as f:
+            parser.ParseFile(f)
+
+        def total(oid):
+            return own.get(oid, 0) + sum(total(c) for c in parts.get(oid, ()))
+        return sum(total(oid) for oid in items)
+    with open(path, 'rb') as f:
+        head = f.read(84)
+        if len(head) == 84 and os.path.getsize(path) == 84 + 50 * struct.unpack('<I', head[80:])[0]:
+            return struct.unpack('<I', head[80:])[0]
+        f.seek(0)
+        return sum(line.lstrip().startswith(b'facet') for line in f)
+
+
+# ── Worker ───────────────────────────────────────────────────────────────────
+
+def build_variant(script, params, out_dir):
+    """Run `script` with `params` applied as its own process in `out_dir`.
+
+    Returns the manifest entry.  A failed run is recorded in it as
+    'error' (with whatever outputs it left) rather than raised, so one
+    bad variant does not lose the others.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with open(script, encoding='utf-8') as f:
+        source = override_source(f.read(), params, os.path.basename(script))
+
+    # The variant is a real file inside out_dir, so OUT_DIR-style paths,
+    # relative paths and multiprocessing's re-import of __main__ (spawn)
+    # all resolve to it; the mesh_* modules come from next to this file
+    variant = os.path.join(out_dir, os.path.basename(script))
+    with open(variant, 'w', encoding='utf-8') as f:
+        f.write(source)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [HERE, env.get('PYTHONPATH')]))
+    t0 = time.perf_counter()
+    with open(os.path.join(out_dir, 'run.log'), 'w', encoding='utf-8') as log:
+        proc = subprocess.run([sys.executable, os.path.basename(variant)], cwd=out_dir,
+                              env=env, stdout=log, stderr=subprocess.STDOUT)
+    seconds = time.perf_counter() - t0
+
+    outputs = {}
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(('.stl', '.3mf')):
+            path = os.path.join(out_dir, name)
+            outputs[name] = {'tris': count_tris(path), 'bytes': os.path.getsize(path)}
+    entry = {'script': os.path.basename(script), 'params': params,
+             'dir': os.path.relpath(out_dir, HERE), 'outputs': outputs,
+             'seconds': round(seconds, 3)}
+    if proc.returncode:
+        entry['error'] = (f"exit {proc.returncode}; see "
+                          f"{os.path.join(out_dir, 'run.log')}")
+    return entry
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def run_batch(script, grid, out_root=OUT_ROOT, workers=None):
+    """Build every parameter set in `grid`. Returns the manifest entries."""
+    script = os.path.abspath(script)
+    stem = os.path.splitext(os.path.basename(script))[0]
+    jobs = [(script, p, os.path.join(out_root, stem, variant_name(p))) for p in grid]
+    # Check every override before starting any build
+    with open(script, encoding='utf-8') as f:
+        source = f.read()
+    for p in grid:
+        override_source(source, p, os.path.basename(script))
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        return [build_variant(*job) for job in jobs]
+    # Each variant is its own process; the threads only wait on them
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(build_variant, *zip(*jobs)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build parameter-sweep variants of a generator.")
+    ap.add_argument('script', help="generator script, e.g. generate_lego.py")
+    ap.add_argument('--set', action='append', default=[], metavar='NAME=VALUES',
+                    help="override a module constant; repeat for more axes")
+    ap.add_argument('--out', default=OUT_ROOT, help="output root (default: batch_out/)")
+    ap.add_argument('-j', '--jobs', type=int, default=None, help="worker processes")
+    args = ap.parse_args(argv)
+
+    grid = parse_grid(args.set)
+    print(f"=== {os.path.basename(args.script)}: {len(grid)} variant(s) ===")
+    t0 = time.perf_counter()
+    try:
+        entries = run_batch(args.script, grid, args.out, args.jobs)
+    except ValueError as e:
+        ap.error(str(e))
+    for e in entries:
+        if 'error' in e:
+            info = f"FAILED ({e['error']})"
+        else:
+            info = ", ".join(f"{n} {o['tris']}" for n, o in e['outputs'].items())
+        print(f"  {variant_name(e['params']):<40} {e['seconds']:>7.2f}s  {info}")
+
+    stem = os.path.splitext(os.path.basename(args.script))[0]
+    manifest = os.path.join(args.out, stem, "manifest.json")
+    os.makedirs(os.path.dirname(manifest), exist_ok=True)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'seconds': round(time.perf_counter() - t0, 3),
+                   'variants': entries}, f, indent=2)
+    print(f"\nManifest -> {manifest}")
+    failed = sum('error' in e for e in entries)
+    if failed:
+        print(f"{failed} of {len(entries)} variant(s) failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
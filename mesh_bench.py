@@ -0,0 +1,268 @@
+"""
+Mesh Bench — benchmark / regression harness for the generators
+===============================================================
+Builds every model at several resolutions and records, per case:
+
+  build_s       best-of-N wall time of the build function (weld included)
+  stl_s, 3mf_s  export times
+  tris, verts   mesh size
+  stl_bytes, 3mf_bytes
+  peak_rss_kb   peak resident memory of the process that ran the case
+
+Each case runs in its own fresh worker process (so peak RSS belongs to
+that case alone), calls the generator's build function directly and
+writes to a temporary directory.  No slicer, display or network needed.
+
+    python mesh_bench.py                   # run, append to bench/history.json
+    python mesh_bench.py --save-baseline   # ... and make this run the baseline
+    python mesh_bench.py -k lego -s 1 2    # subset of cases / scales
+
+Every run is compared with bench/baseline.json.  More triangles, vertices
+or bytes than the baseline, a build more than TIME_TOL slower, or RSS more
+than RSS_TOL higher is reported as a regression (exit status 1).  Timings
+and memory are machine-specific, so no baseline ships with the repo: the
+first run on a machine saves its results as the baseline (and says so).
+
+Workers are started with the spawn method, so a worker's peak RSS does
+not include memory inherited from this process.  Peak RSS needs the
+Unix `resource` module; elsewhere it is reported as missing and not
+compared.
+
+Resolution scale s multiplies each model's tessellation knobs: helix
+steps and wire segments, grid resolutions, and circle segment counts
+(CHORD_TOL / s^2, since sides grow with 1/sqrt(tolerance)).
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:     # not on Windows: peak RSS is not measured
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(HERE, "bench")
+HISTORY = os.path.join(BENCH_DIR, "history.json")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+SCALES = (1, 2, 4)
+REPEAT = 3
+TIME_TOL = 0.25      # build may be this much slower than baseline ...
+TIME_SLACK = 0.02    # ... plus this many seconds, before it is flagged
+RSS_TOL = 0.20       # peak RSS may grow this much
+
+
+# ── Cases ────────────────────────────────────────────────────────────────────
+# Each case: generator module, scale(module, s), build(module) -> Mesh
+
+def _consts(*names):
+    """Scaler multiplying integer module constants read at build time."""
+    def scale(g, s):
+        for n in names:
+            setattr(g, n, getattr(g, n) * s)
+    return scale
+
+
+def _defaults(*funcs):
+    """Scaler multiplying the integer default arguments of functions."""
+    def scale(g, s):
+        for name in funcs:
+            fn = getattr(g, name)
+            fn.__defaults__ = tuple(d * s if type(d) is int else d
+                                    for d in fn.__defaults__)
+    return scale
+
+
+def _gauntlet_scale(g, s):
+    hollow_tube = g.hollow_tube
+
+    def scaled(m, profiles, segs=32, **kw):
+        return hollow_tube(m, profiles, segs=segs * s, **kw)
+    g.hollow_tube = scaled
+
+
+def _fill(fn):
+    def build(g):
+        m = g.Mesh()
+        getattr(g, fn)(m)
+        return m
+    return build
+
+
+def _mario(g):
+    m = g.build_body()
+    m.merge(g.build_qmark())
+    return m
+
+
+def _rocket(g):
+    parts = g.build_parts(workers=1, cache_dir=None)
+    m = g.Mesh()
+    m.merge(g.build_print_plate(parts))
+    m.merge(g.build_assembly(parts))
+    return m
+
+
+CASES = {
+    'spring':   ('generate_spring', _consts('STEPS', 'CROSS_SEGS'), _fill('build_spring')),
+    'brain':    ('generate_brain',
+                 _defaults('add_brain'),
+                 lambda g: g.build_brain()),
+    'lego':     ('generate_lego', None, lambda g: g.build_lego_2x6()),
+    'mario':    ('generate_mario_block', None, _mario),
+    'gauntlet': ('generate_gauntlet_stl', _gauntlet_scale, lambda g: g.generate()),
+    'shock':    ('generate_shock_absorber', _consts('STEPS', 'CS'), _fill('build')),
+    'rocket':   ('generate_rocket_launcher', _consts('SPR_STEPS', 'SPR_CS', 'NOSE_SEGS'),
+                 _rocket),
+}
+
+
+# ── Worker ───────────────────────────────────────────────────────────────────
+
+def run_case(case, s, repeat=REPEAT):
+    """Build and export one case at scale `s`. Runs in a fresh process."""
+    sys.path.insert(0, HERE)
+    import mesh_io
+    module, scale, build = CASES[case]
+    g = importlib.import_module(module)
+    if scale and s != 1:
+        scale(g, s)
+    g.Mesh.CHORD_TOL = g.Mesh.CHORD_TOL / (s * s)
+
+    best = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            m = build(g)
+            verts, tris = m.verts, m.tris       # forces the weld
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+
+    out = tempfile.mkdtemp(prefix="mesh_bench_")
+    try:
+        stl, mf = os.path.join(out, "m.stl"), os.path.join(out, "m.3mf")
+        t0 = time.perf_counter()
+        mesh_io.write_stl(stl, verts, tris)
+        t1 = time.perf_counter()
+        comps, (v, t) = m.components()
+        mesh_io.write_3mf(mf, v, t, app=g.Mesh.APP, components=comps,
+                          items=bool(comps) and not len(t))
+        t2 = time.perf_counter()
+        sizes = os.path.getsize(stl), os.path.getsize(mf)
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+
+    return {
+        'case': case, 'scale': s,
+        'build_s': round(best, 4), 'stl_s': round(t1 - t0, 4), '3mf_s': round(t2 - t1, 4),
+        'tris': int(len(tris)), 'verts': int(len(verts)),
+        'stl_bytes': sizes[0], '3mf_bytes': sizes[1],
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+
+def _peak_rss_kb():
+    """Peak resident memory of this process in KB, or None if unknown."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss     # macOS: bytes
+
+
+# ── Comparison ───────────────────────────────────────────────────────────────
+
+def regressions(result, base):
+    """List of human-readable regressions of `result` against `base`."""
+    out = []
+    for k in ('tris', 'verts', 'stl_bytes', '3mf_bytes'):
+        if result[k] > base[k]:
+            out.append(f"{k} {base[k]} -> {result[k]}")
+    if result['build_s'] > base['build_s'] * (1 + TIME_TOL) + TIME_SLACK:
+        out.append(f"build {base['build_s']:.3f}s -> {result['build_s']:.3f}s")
+    if None not in (result['peak_rss_kb'], base['peak_rss_kb']) and \
+            result['peak_rss_kb'] > base['peak_rss_kb'] * (1 + RSS_TOL):
+        out.append(f"rss {base['peak_rss_kb']} -> {result['peak_rss_kb']} KB")
+    return out
+
+
+def _load(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _save(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+
+def _git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the mesh generators.")
+    ap.add_argument('-k', '--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    ap.add_argument('-s', '--scales', nargs='+', type=int, default=list(SCALES))
+    ap.add_argument('-n', '--repeat', type=int, default=REPEAT, help="builds per case (best kept)")
+    ap.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    args = ap.parse_args(argv)
+
+    baseline = {(r['case'], r['scale']): r for r in _load(BASELINE, {}).get('results', [])}
+    results, flagged = [], 0
+    print(f"{'case':<10}{'s':>3}{'build s':>10}{'tris':>10}{'verts':>9}"
+          f"{'STL KB':>9}{'3MF KB':>9}{'RSS MB':>8}")
+    # A fresh spawned process per case: peak RSS then belongs to that case
+    # alone, with nothing inherited from this process
+    ctx = multiprocessing.get_context('spawn')
+    for case in args.cases:
+        for s in args.scales:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                r = ex.submit(run_case, case, s, args.repeat).result()
+            results.append(r)
+            rss = '-' if r['peak_rss_kb'] is None else f"{r['peak_rss_kb'] / 1024:.1f}"
+            print(f"{case:<10}{s:>3}{r['build_s']:>10.3f}{r['tris']:>10}{r['verts']:>9}"
+                  f"{r['stl_bytes'] // 1024:>9}{r['3mf_bytes'] // 1024:>9}{rss:>8}")
+            base = baseline.get((case, s))
+            for msg in regressions(r, base) if base else ():
+                print(f"    REGRESSION {msg}")
+                flagged += 1
+
+    run = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'rev': _git_rev(),
+           'python': sys.version.split()[0], 'results': results}
+    history = _load(HISTORY, [])
+    history.append(run)
+    _save(HISTORY, history)
+    if args.save_baseline:
+        _save(BASELINE, run)
+        print(f"\nBaseline -> {BASELINE}")
+    elif not os.path.exists(BASELINE):
+        _save(BASELINE, run)
+        print(f"\nNo baseline yet: saved this run as the baseline -> {BASELINE}")
+    elif flagged:
+        print(f"\n{flagged} regression(s) against baseline {_load(BASELINE, {}).get('rev', '')}")
+    return 1 if flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Mesh Cache — content-addressed cache for generated models
+==========================================================
+Two layers, both stored in a .mesh_cache/ directory next to the outputs:
+
+Build cache (cached_build, mesh_parts.build_parts(cache_dir=...)):
+  A builder function's fingerprint hashes
+    - the bytecode, constants and default arguments of the builder and of
+      every function / Mesh subclass of its own module it refers to,
+      followed transitively, and of the Mesh class the part is built as,
+    - the current values of the module-level constants those functions
+      read (COIL_R, CRADLE_PRONG_H, ..., NumPy arrays by their bytes), and
+    - the source of the shared mesh_*.py modules (library version).
+  The finished mesh's arrays (base geometry plus instance templates and
+  transforms, Mesh.to_arrays) are stored as parts/<key>.npz.
+  A part is rebuilt only when something it actually depends on changed.
+  Editing a cradle constant leaves the cached barrel and rocket alone.
+
+Output cache (Mesh.save_stl / save_3mf, or any writer through
+content_key / output_current / record_output):
+  Each written file is recorded in outputs.json with a hash of the mesh
+  arrays and export options.  If the file on disk still matches (same
+  size and mtime) and the content hash is unchanged, writing is skipped.
+"""
+import hashlib
+import json
+import os
+import sys
+import types
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+CACHE_NAME = ".mesh_cache"
+_SIMPLE = (int, float, complex, str, bytes, bool, type(None))
+_library_version = None
+
+
+def cache_dir_for(path):
+    """Cache directory that sits next to output file (or directory) `path`."""
+    base = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    return os.path.join(base, CACHE_NAME)
+
+
+# ── Fingerprints ─────────────────────────────────────────────────────────────
+
+def library_version():
+    """Hash of the source of every mesh_*.py module next to this one."""
+    global _library_version
+    if _library_version is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256()
+        for name in sorted(os.listdir(here)):
+            if name.startswith('mesh_') and name.endswith('.py'):
+                with open(os.path.join(here, name), 'rb') as f:
+                    h.update(name.encode() + b'\0' + f.read())
+        _library_version = h.hexdigest()
+    return _library_version
+
+
+def _is_data(v):
+    if isinstance(v, _SIMPLE):
+        return True
+    if isinstance(v, (tuple, list)):
+        return all(_is_data(x) for x in v)
+    if isinstance(v, dict):
+        return all(_is_data(k) and _is_data(x) for k, x in v.items())
+    return False
+
+
+def _hash_data(h, name, v):
+    """Hash constant `v` under `name`; False if it is not plain data."""
+    if isinstance(v, np.ndarray):
+        h.update(f"{name}={v.dtype.str}{v.shape}\0".encode())
+        h.update(np.ascontiguousarray(v).tobytes())
+        return True
+    if _is_data(v):
+        h.update(f"{name}={v!r}\0".encode())
+        return True
+    return False
+
+
+def _walk_code(code, g, h, seen):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            _walk_code(c, g, h, seen)
+        else:
+            h.update(repr(c).encode())
+    for name in code.co_names:
+        if name not in g:
+            continue
+        v = g[name]
+        if isinstance(v, (types.FunctionType, type)):
+            if getattr(v, '__module__', None) == g.get('__name__'):
+                _walk(v, g, h, seen)
+        else:
+            _hash_data(h, name, v)
+
+
+def _walk(obj, g, h, seen):
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, type):
+        # Only classes from the generator itself; mesh_core and friends are
+        # covered by library_version()
+        for klass in obj.__mro__:
+            if klass.__module__ != obj.__module__:
+                continue
+            h.update(klass.__qualname__.encode())
+            for name, attr in sorted(vars(klass).items()):
+                if isinstance(attr, (staticmethod, classmethod)):
+                    attr = attr.__func__
+                if isinstance(attr, types.FunctionType):
+                    _walk(attr, g, h, seen)
+                elif not name.startswith('__'):
+                    _hash_data(h, name, attr)
+        return
+    h.update(repr((obj.__defaults__, obj.__kwdefaults__)).encode())
+    _walk_code(obj.__code__, g, h, seen)
+
+
+def fingerprint(fn, into=None):
+    """Cache key for the mesh built by `fn` (see module docstring).
+
+    A generator-local Mesh class the part is built / restored as
+    (part_class) is walked too: a builder that only fills the mesh it is
+    handed never names it.
+    """
+    h = hashlib.sha256(library_version().encode())
+    seen = set()
+    _walk(fn, fn.__globals__, h, seen)
+    cls = part_class(fn, into)
+    if cls.__module__ == fn.__module__:
+        _walk(cls, fn.__globals__, h, seen)
+    return h.hexdigest()[:32]
+
+
+# ── Build cache ──────────────────────────────────────────────────────────────
+
+def load_part(cache_dir, key, cls):
+    """Mesh of class `cls` from the cache, or None on a miss."""
+    path = os.path.join(cache_dir, 'parts', key + '.npz')
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return cls.from_arrays(data)
+
+
+def store_part(cache_dir, key, mesh):
+    """Save `mesh`'s arrays (instance groups included) under `key` (atomically)."""
+    d = os.path.join(cache_dir, 'parts')
+    os.makedirs(d, exist_ok=True)
+    tmp = os.path.join(d, f"{key}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, **mesh.to_arrays())
+    os.replace(tmp, os.path.join(d, key + '.npz'))
+
+
+def part_class(fn, into=None):
+    """Mesh class a cached part of builder `fn` is restored as."""
+    if into is not None:
+        return into
+    cls = fn.__globals__.get('Mesh')
+    if cls is None:
+        import mesh_core
+        cls = mesh_core.Mesh
+    return cls
+
+
+def cached_build(fn, cache_dir, into=None):
+    """Return fn()'s mesh, from the cache when its fingerprint is known.
+
+    into : for builders that fill a mesh passed in (build(mesh)) rather
+           than returning one: the Mesh class to create and pass.
+    """
+    key = fingerprint(fn, into)
+    cls = part_class(fn, into)
+    m = load_part(cache_dir, key, cls)
+    if m is not None:
+        print(f"  [cache] {fn.__name__}")
+        return m
+    if into is None:
+        m = fn()
+    else:
+        m = into()
+        fn(m)
+    store_part(cache_dir, key, m)
+    return m
+
+
+# ── Output cache ─────────────────────────────────────────────────────────────
+
+def content_key(verts, tris, *options, arrays=()):
+    """Hash of mesh arrays (plus any further `arrays`) and export options."""
+    h = hashlib.sha256()
+    for a in (verts, tris, *arrays):
+        h.update(np.ascontiguousarray(a).tobytes())
+    h.update(repr(options).encode())
+    return h.hexdigest()[:32]
+
+
+def _index_path(path):
+    return os.path.join(cache_dir_for(path), 'outputs.json')
+
+
+def _read_index(path):
+    try:
+        with open(_index_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def output_current(path, key):
+    """True if `path` exists and was last written from content `key`."""
+    if not os.path.exists(path):
+        return False
+    rec = _read_index(path).get(os.path.basename(path))
+    st = os.stat(path)
+    return bool(rec) and rec == {'key': key, 'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+
+def record_output(path, key):
+    """Note that `path` now holds content `key`."""
+    index = _read_index(path)
+    st = os.stat(path)
+    index[os.path.basename(path)] = {'key': key, 'size': st.st_size, 'mtime': st.st_mtime_ns}
+    os.makedirs(cache_dir_for(path), exist_ok=True)
+    tmp = f"{_index_path(path)}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, _index_path(path))
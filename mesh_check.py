@@ -0,0 +1,86 @@
+"""
+Mesh Check — manifold / watertight validator
+=============================================
+Catches the problems a slicer would otherwise report first: open edges,
+edges shared by more than two triangles, flipped triangles, zero-area
+triangles and inside-out shells.
+
+Everything is one edge-hash pass over the triangle array.  Each of the
+3 directed edges per face is packed into an int64 key.  Sorting and
+counting those keys classifies every edge at once:
+
+  boundary      undirected edge used by exactly 1 face  (hole / crack)
+  non-manifold  undirected edge used by 3+ faces
+  flipped       manifold edge traversed the same way by both faces
+                (neighbouring triangles with inconsistent winding)
+
+Signed volume is the divergence-theorem sum over faces; it is positive
+for a closed, outward-facing shell.
+
+    report = check(verts, faces)      # plain dict
+    mesh.check()                      # prints a one-line summary too
+"""
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+AREA_EPS = 1e-12    # mm^2; triangles below this area count as degenerate
+
+
+def check(verts, faces):
+    """Validate an indexed triangle mesh. Returns a dict of counts.
+
+    Keys: tris, verts, boundary_edges, nonmanifold_edges, flipped_edges,
+    degenerate_faces, volume (mm^3), area (mm^2), watertight (bool).
+    """
+    v = np.asarray(verts, np.float64).reshape(-1, 3)
+    f = np.asarray(faces, np.int64).reshape(-1, 3)
+    n = max(len(v), 1)
+
+    # Directed edges a->b of every face, packed as a*n + b
+    a = f.ravel()
+    b = f[:, [1, 2, 0]].ravel()
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    ukey = lo * n + hi
+
+    _, uinv, ucount = np.unique(ukey, return_inverse=True, return_counts=True)
+    boundary = int((ucount == 1).sum())
+    nonmanifold = int((ucount > 2).sum())
+
+    # On 2-face edges, a consistently wound pair runs a->b and b->a.
+    # The same direction twice means a flipped neighbour.
+    manifold = ucount[uinv.ravel()] == 2
+    dkey = (a * n + b)[manifold]
+    _, dcount = np.unique(dkey, return_counts=True)
+    flipped = int((dcount > 1).sum())
+
+    c = v[f]
+    cross = np.cross(c[:, 1] - c[:, 0], c[:, 2] - c[:, 0])
+    area2 = np.linalg.norm(cross, axis=1)
+    repeated = (f[:, 0] == f[:, 1]) | (f[:, 1] == f[:, 2]) | (f[:, 0] == f[:, 2])
+    degenerate = int((repeated | (area2 < 2 * AREA_EPS)).sum())
+    volume = float(np.einsum('ij,ij->', c[:, 0], np.cross(c[:, 1], c[:, 2])) / 6.0)
+
+    return {
+        'tris': len(f),
+        'verts': len(v),
+        'boundary_edges': boundary,
+        'nonmanifold_edges': nonmanifold,
+        'flipped_edges': flipped,
+        'degenerate_faces': degenerate,
+        'volume': volume,
+        'area': float(area2.sum() / 2.0),
+        'watertight': boundary == 0 and nonmanifold == 0 and flipped == 0,
+    }
+
+
+def summary(r):
+    """One-line human-readable form of a check() report."""
+    status = "OK " if r['watertight'] and r['volume'] > 0 else "BAD"
+    return (f"  CHECK {status} {r['boundary_edges']} open, "
+            f"{r['nonmanifold_edges']} non-manifold, {r['flipped_edges']} flipped, "
+            f"{r['degenerate_faces']} degenerate  vol {r['volume'] / 1000:.2f} cm3")
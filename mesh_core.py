@@ -0,0 +1,587 @@
+"""
+Mesh Core — shared mesh container for the generate_*.py scripts
+================================================================
+One indexed triangle mesh used by every model generator.
+
+Vertices live in a contiguous float32 (n, 3) array and triangles in an
+int32 (m, 3) array.  Both grow geometrically, so appending is amortized
+O(1) and no per-vertex Python objects are kept around.
+
+Two ways to add geometry:
+  - Bulk:   add_vertices(array) / add_faces(array)  — raw, no dedupe
+  - Legacy: v() / tri() / quad()  — point-by-point, staged in small lists
+            and flushed to the arrays in one go
+
+Point-by-point geometry is not deduplicated as it is added.  Every corner
+is appended raw and the whole mesh is welded once, in bulk, the first time
+verts/tris are read afterwards (see weld_vertices): coincident vertices
+within WELD_EPS are merged, indices remapped and collapsed triangles
+dropped.
+
+Repeated round features (studs, tubes, pegs) are stamped from cached
+mesh_prims templates with add_instances(), one array operation per batch.
+
+translate() / transform() only record a pending affine transform.  It is
+applied in one vectorized step when verts are read (export, merge) and
+baked into the arrays only if more geometry is added afterwards, so
+floor_to_z0() and friends never re-weld or rewrite the mesh.
+
+Generators subclass Mesh to add their own primitives (cyl_y, tube_x, ...)
+and set APP to the name written into 3MF metadata.  Round primitives take
+their segment count from segs_for(r): enough sides to keep the polygon
+within CHORD_TOL of the true circle, so small pegs get few and large
+barrels get many.
+"""
+import math
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_cache
+import mesh_check
+import mesh_decimate
+import mesh_io
+import mesh_prims
+
+WELD_EPS = 1e-4     # mm; vertices closer than this on every axis are merged
+
+CHORD_TOL = 0.025   # mm; max gap between a true circle and its polygon
+MIN_SEGS = 8        # fewest sides any circle gets
+
+# Half of the 26 neighbour cells; the other half is covered by symmetry
+_HALF_NEIGHBOURS = [(dx, dy, dz)
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                    if (dx, dy, dz) > (0, 0, 0)]
+
+
+def segments_for(r, tol=CHORD_TOL, min_segs=MIN_SEGS):
+    """Polygon sides needed for a circle of radius `r` to stay within `tol`.
+
+    A regular n-gon inscribed in radius r deviates from the circle by the
+    sagitta r * (1 - cos(pi / n)); this returns the smallest n keeping
+    that <= tol, rounded up to a multiple of 4 so the polygon keeps its
+    points on both axes (flat bed contact, symmetric fits).
+    """
+    if r <= tol:
+        return min_segs
+    n = math.ceil(math.pi / math.acos(1.0 - tol / r))
+    return max(min_segs, -(-n // 4) * 4)
+
+
+def weld_vertices(verts, faces, eps=WELD_EPS):
+    """Merge vertices closer than `eps` (per axis) and drop collapsed faces.
+
+    Spatial hash on a grid of `eps`-sized cells: points in one cell are
+    merged outright, and neighbouring cells are joined when their first
+    points are within `eps`, so near-coincident vertices that straddle a
+    cell boundary still weld.  Each merged group keeps its lowest-index
+    vertex, and the surviving vertices keep their original order.
+
+    Returns (verts, faces, remap) where remap[old index] -> new index.
+    """
+    verts = np.asarray(verts)
+    faces = np.asarray(faces, np.int64).reshape(-1, 3)
+    if not len(verts):
+        return verts, faces, np.zeros(0, np.int64)
+
+    # Integer cell coordinates packed into one int64 key (mixed radix),
+    # with a one-cell margin so neighbour keys never wrap
+    q = np.floor(verts.astype(np.float64) / eps).astype(np.int64)
+    q -= q.min(axis=0) - 1
+    dims = q.max(axis=0) + 2
+    if int(dims[0]) * int(dims[1]) * int(dims[2]) >= 2**62:
+        raise ValueError(f"weld grid too fine: eps={eps} over a "
+                         f"{np.ptp(verts, axis=0)} mm extent")
+    sy, sz = int(dims[1]) * int(dims[2]), int(dims[2])
+    key = q[:, 0] * sy + q[:, 1] * sz + q[:, 2]
+    cells, first, cell_of = np.unique(key, return_index=True, return_inverse=True)
+    cell_of = cell_of.ravel()
+
+    # Pairs of occupied neighbouring cells whose representatives are close
+    rep_pos = verts[first].astype(np.float64)
+    ids = np.arange(len(cells))
+    pa, pb = [], []
+    for dx, dy, dz in _HALF_NEIGHBOURS:
+        nkey = cells + (dx * sy + dy * sz + dz)
+        pos = np.searchsorted(cells, nkey)
+        hit = pos < len(cells)
+        hit[hit] = cells[pos[hit]] == nkey[hit]
+        a, b = ids[hit], pos[hit]
+        close = np.abs(rep_pos[a] - rep_pos[b]).max(axis=1) <= eps
+        pa.append(a[close])
+        pb.append(b[close])
+    a, b = np.concatenate(pa), np.concatenate(pb)
+
+    # Connected components by min-label propagation with pointer jumping
+    label = ids.copy()
+    while len(a):
+        m = np.minimum(label[a], label[b])
+        if not ((label[a] != m) | (label[b] != m)).any():
+            break
+        np.minimum.at(label, a, m)
+        np.minimum.at(label, b, m)
+        label = label[label]
+
+    # Lowest original vertex index of each group is the survivor
+    keep = np.full(len(cells), len(verts), np.int64)
+    np.minimum.at(keep, label, first)
+    rep = keep[label[cell_of]]
+    survivors = np.unique(rep)
+    remap = np.searchsorted(survivors, rep)
+
+    f = remap[faces]
+    ok = (f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])
+    return verts[survivors], f[ok], remap
+
+
+def join_meshes(parts, seam_eps=WELD_EPS):
+    """Concatenate [(verts, faces), ...] into one indexed mesh.
+
+    Returns (verts, faces, part) with part[k] = index of the input face k
+    came from.  The inputs are taken to be welded already, so only their
+    seams are welded: vertices on an open edge of their input (an edge
+    of one face only) are merged within `seam_eps`, the rest is copied
+    through.  seam_eps=None skips the weld.
+    """
+    vs, fs, part, n = [], [], [], 0
+    for i, (v, f) in enumerate(parts):
+        v = np.asarray(v, np.float32).reshape(-1, 3)
+        f = np.asarray(f, np.int64).reshape(-1, 3)
+        vs.append(v)
+        fs.append(f + n)
+        part.append(np.full(len(f), i, np.int32))
+        n += len(v)
+    verts, faces, part = np.concatenate(vs), np.concatenate(fs), np.concatenate(part)
+    if seam_eps is None or len(vs) < 2:
+        return verts, faces, part
+
+    # Seam candidates: vertices of open edges.  Edges are keyed globally,
+    # and faces of different inputs never share a vertex yet, so a count
+    # of one is an open edge of that face's own input
+    a = faces.ravel()
+    b = faces[:, [1, 2, 0]].ravel()
+    key = np.minimum(a, b) * len(verts) + np.maximum(a, b)
+    edges, count = np.unique(key, return_counts=True)
+    open_ = edges[count == 1]
+    cand = np.unique(np.concatenate([open_ // len(verts), open_ % len(verts)]))
+    if not len(cand):
+        return verts, faces, part
+
+    # Weld the candidates; each group maps to its lowest global index
+    _, _, sub = weld_vertices(verts[cand], np.zeros((0, 3), np.int64), seam_eps)
+    rep = np.full(sub.max() + 1, len(cand))
+    np.minimum.at(rep, sub, np.arange(len(cand)))
+    target = np.arange(len(verts))
+    target[cand] = cand[rep[sub]]
+    keep = np.unique(target)
+    f = np.searchsorted(keep, target)[faces]
+    ok = (f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])
+    return verts[keep], f[ok], part[ok]
+
+
+def _compose(a, b):
+    """Affine transform(s) `a` followed by `b`, both in (..., 4, 3) form."""
+    return np.concatenate([a[..., :3, :] @ b[:3], a[..., 3:, :] @ b[:3] + b[3]], axis=-2)
+
+
+def _apply(xf, verts):
+    """float32 `verts` moved by the (4, 3) transform `xf`.
+
+    Pure translations are added in float32, exactly as an in-place shift
+    of the vertex array would be.
+    """
+    if np.array_equal(xf[:3], np.eye(3)):
+        return verts + xf[3].astype(np.float32)
+    return (verts.astype(np.float64) @ xf[:3] + xf[3]).astype(np.float32)
+
+
+class Mesh:
+    """Indexed triangle mesh with float32 vertex and int32 face arrays."""
+
+    APP = "MeshGen"       # <metadata name="Application"> in 3MF output
+    WELD_EPS = WELD_EPS   # weld tolerance for point-by-point geometry
+    CHORD_TOL = CHORD_TOL # circle tessellation tolerance for segs_for()
+
+    def __init__(self):
+        self._v = np.empty((256, 3), np.float32)
+        self._f = np.empty((256, 3), np.int32)
+        self._nv = 0
+        self._nf = 0
+        self._sv = []   # staged vertices from v()/tri()
+        self._sf = []   # staged faces from tri()
+        self._dirty = False     # raw point-by-point data awaiting weld()
+        self._groups = {}       # id(key) -> [key, verts, faces, transforms]
+        self._flat = None       # cached welded (verts, tris) incl. instances
+        self._xf = None         # pending (4, 3) affine transform, see transform()
+        self._out = None        # cached transformed verts
+
+    # ── Storage ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _grow(buf, need):
+        """Return `buf` or a copy with room for `need` rows (doubling)."""
+        if need <= len(buf):
+            return buf
+        cap = max(need, 2 * len(buf))
+        out = np.empty((cap, 3), buf.dtype)
+        out[:len(buf)] = buf
+        return out
+
+    def _flush(self):
+        """Move staged v()/tri() data into the arrays."""
+        if self._sv or self._sf:
+            self._bake()
+            self._dirty = True
+            self._flat = self._out = None
+        if self._sv:
+            sv, self._sv = self._sv, []
+            self._append_verts(np.asarray(sv, np.float32))
+        if self._sf:
+            sf, self._sf = self._sf, []
+            self._append_faces(np.asarray(sf, np.int32))
+
+    def _append_verts(self, arr):
+        self._bake()
+        self._flat = self._out = None
+        n = len(arr)
+        self._v = self._grow(self._v, self._nv + n)
+        self._v[self._nv:self._nv + n] = arr
+        self._nv += n
+
+    def _append_faces(self, arr):
+        self._bake()
+        self._flat = self._out = None
+        n = len(arr)
+        self._f = self._grow(self._f, self._nf + n)
+        self._f[self._nf:self._nf + n] = arr
+        self._nf += n
+
+    def _bake(self):
+        """Apply the pending transform to the stored arrays and groups."""
+        if self._xf is None:
+            return
+        xf, self._xf = self._xf, None
+        self._v[:self._nv] = _apply(xf, self._v[:self._nv])
+        for g in self._groups.values():
+            g[3] = _compose(g[3], xf)
+        self._flat = self._out = None
+
+    def _flatten(self, groups=None):
+        """Welded (verts, tris) of the base arrays plus the stamped copies
+        of instance `groups` (default: all of them, cached), before the
+        pending transform."""
+        self._flush()
+        cache = groups is None
+        if cache:
+            if self._flat is not None:
+                return self._flat
+            groups = list(self._groups.values())
+        if not groups:
+            if self._dirty:
+                self.weld()
+            return self._v[:self._nv], self._f[:self._nf]
+        vs, fs, n = [self._v[:self._nv]], [self._f[:self._nf]], self._nv
+        for _, tv, tf, xf in groups:
+            sv, sf = mesh_prims.transform((tv, tf), xf)
+            vs.append(sv.astype(np.float32))
+            fs.append(sf + n)
+            n += len(sv)
+        v, f, _ = weld_vertices(np.concatenate(vs), np.concatenate(fs), self.WELD_EPS)
+        flat = v, f.astype(np.int32)
+        if cache:
+            self._flat = flat
+        return flat
+
+    @property
+    def verts(self):
+        """(n, 3) float32 array of the (welded) vertices, instances included."""
+        v = self._flatten()[0]
+        if self._xf is None:
+            return v
+        if self._out is None:
+            self._out = _apply(self._xf, v)
+        return self._out
+
+    @property
+    def tris(self):
+        """(m, 3) int32 array of the (welded) triangles, instances included."""
+        return self._flatten()[1]
+
+    @property
+    def instances(self):
+        """[(verts, faces, transforms)] of the recorded instance groups."""
+        return [(v, f, self._placed(xf)) for _, v, f, xf in self._groups.values()]
+
+    def _placed(self, xf):
+        """Instance transforms `xf` followed by the pending transform."""
+        return xf if self._xf is None else _compose(xf, self._xf)
+
+    def weld(self, eps=None):
+        """Weld the base arrays now. Returns the number of vertices merged.
+
+        Instances stay separate; they are welded in whenever verts/tris
+        are read.
+        """
+        self._flush()
+        self._bake()
+        self._dirty = False
+        self._flat = self._out = None
+        n = self._nv
+        v, f, _ = weld_vertices(self._v[:n], self._f[:self._nf],
+                                self.WELD_EPS if eps is None else eps)
+        self._v, self._nv = np.array(v, np.float32), len(v)
+        self._f, self._nf = f.astype(np.int32), len(f)
+        return n - self._nv
+
+    # ── Bulk API ─────────────────────────────────────────────────────────────
+
+    def add_vertices(self, pts):
+        """Append an (n, 3) array of points. Returns index of the first one.
+
+        Bulk vertices are only welded if point-by-point geometry is added too.
+        """
+        self._flush()
+        pts = np.asarray(pts, np.float32).reshape(-1, 3)
+        first = self._nv
+        self._append_verts(pts)
+        return first
+
+    def add_faces(self, faces, offset=0):
+        """Append an (m, 3) array of vertex indices (plus `offset`)."""
+        self._flush()
+        faces = np.asarray(faces, np.int64).reshape(-1, 3) + offset
+        self._append_faces(faces.astype(np.int32))
+
+    def add_geometry(self, verts, faces):
+        """Append a vertex array and its (local-index) faces together."""
+        first = self.add_vertices(verts)
+        self.add_faces(faces, first)
+        return first
+
+    def add_instances(self, template, offsets, axis='z'):
+        """Place copies of a mesh_prims template, one per (x, y, z) offset.
+
+        Copies are kept as template + transform list (see instances) and
+        welded with the rest of the mesh when verts/tris are read, like
+        v()/tri() geometry.  Repeated calls with the same template extend
+        one instance group.
+        """
+        self.add_transformed(template, mesh_prims.placements(offsets, axis))
+
+    def add_transformed(self, template, transforms, key=None):
+        """Place copies of `template` = (verts, faces) by (k, 4, 3) transforms.
+
+        Copies sharing `key` (default: the template object) form one group.
+        """
+        key = template if key is None else key
+        xf = np.asarray(transforms, np.float64).reshape(-1, 4, 3)
+        self._flush()
+        self._bake()
+        g = self._groups.get(id(key))
+        if g is None:
+            self._groups[id(key)] = [key, template[0], template[1], xf]
+        else:
+            g[3] = np.concatenate([g[3], xf])
+        self._flat = self._out = None
+
+    def merge(self, other, offset=None, instance=False, xf=None):
+        """Append all of `other`'s geometry (indices shifted).
+
+        `offset` (dx, dy, dz) places the copy without touching `other`.
+        `xf`, a (4, 3) affine transform, is applied before the offset
+        (e.g. mesh_prims.placements(..., axis='x')[0] to lay a Z-up part
+        along X).  instance=True records `other` as a template placed
+        this way instead (3MF writes each merged part once, as a build
+        item).
+        """
+        place = mesh_prims.placements(offset or (0, 0, 0))
+        if xf is not None:
+            place = _compose(np.asarray(xf, np.float64), place[0])[None]
+        if instance:
+            self.add_transformed((other.verts.copy(), other.tris.copy()), place, key=other)
+            return
+        verts = other.verts
+        if xf is not None:
+            verts = _apply(place[0], verts)
+        elif offset is not None:
+            verts = verts + np.asarray(offset, np.float32)
+        self.add_geometry(verts, other.tris)
+
+    def to_arrays(self):
+        """Base arrays and instance groups as {name: array} (for npz / pickling)."""
+        self._flush()
+        d = {'verts': self._v[:self._nv], 'tris': self._f[:self._nf],
+             'dirty': np.array(self._dirty)}
+        if self._xf is not None:
+            d['xf'] = self._xf
+        for i, (_, v, f, xf) in enumerate(self._groups.values()):
+            d[f'inst{i}_verts'], d[f'inst{i}_tris'], d[f'inst{i}_xf'] = v, f, xf
+        return d
+
+    @classmethod
+    def from_arrays(cls, data):
+        """Mesh rebuilt from a to_arrays() mapping."""
+        m = cls()
+        m.add_geometry(data['verts'], data['tris'])
+        m._dirty = 'dirty' in data and bool(data['dirty'])
+        i = 0
+        while f'inst{i}_verts' in data:
+            m.add_transformed((np.asarray(data[f'inst{i}_verts']),
+                               np.asarray(data[f'inst{i}_tris'])), data[f'inst{i}_xf'])
+            i += 1
+        if 'xf' in data:
+            m.transform(data['xf'])
+        return m
+
+    # ── Point-by-point API ───────────────────────────────────────────────────
+
+    def v(self, x, y, z):
+        """Append a raw vertex and return its index (welded later)."""
+        self._sv.append((x, y, z))
+        return self._nv + len(self._sv) - 1
+
+    def tri(self, a, b, c):
+        n = self._nv + len(self._sv)
+        self._sv += (a, b, c)
+        self._sf.append((n, n + 1, n + 2))
+
+    def quad(self, a, b, c, d):
+        self.tri(a, b, c)
+        self.tri(a, c, d)
+
+    def segs_for(self, r):
+        """Segment count for a circle of radius `r` (see segments_for)."""
+        return segments_for(r, self.CHORD_TOL)
+
+    # ── Geometry ─────────────────────────────────────────────────────────────
+
+    def face_normals(self):
+        """(m, 3) unit face normals; degenerate faces get (0, 0, 1)."""
+        return mesh_io.facet_normals(self.verts[self.tris])
+
+    def vertex_normals(self):
+        """(n, 3) area-weighted unit vertex normals."""
+        v = self.verts.astype(np.float64)
+        t = self.tris
+        fn = np.cross(v[t[:, 1]] - v[t[:, 0]], v[t[:, 2]] - v[t[:, 0]])
+        vn = np.zeros_like(v)
+        for k in range(3):
+            np.add.at(vn, t[:, k], fn)
+        ln = np.linalg.norm(vn, axis=1)
+        ok = ln > 1e-12
+        vn[ok] /= ln[ok, None]
+        return vn
+
+    def transform(self, xf):
+        """Apply a (4, 3) affine transform (p @ xf[:3] + xf[3]) to the mesh.
+
+        Nothing is moved yet: the transform is composed with any pending one
+        and applied in one array operation when verts are read, or baked
+        into the stored arrays once more geometry is added.  The welded
+        arrays stay cached, so a transform never triggers a re-weld.
+        """
+        self._flush()
+        xf = np.asarray(xf, np.float64).reshape(4, 3)
+        self._xf = xf if self._xf is None else _compose(self._xf, xf)
+        self._out = None
+
+    def translate(self, dx, dy, dz=0):
+        self.transform(mesh_prims.placements((dx, dy, dz))[0])
+
+    def floor_to_z0(self):
+        """Shift mesh so lowest vertex sits at z = 0."""
+        if not len(self.verts):
+            return
+        z_min = float(self.verts[:, 2].min())
+        if abs(z_min) > 1e-6:
+            self.translate(0, 0, -z_min)
+
+    def decimate(self, target=None, max_rms=None, feature_angle=mesh_decimate.FEATURE_ANGLE):
+        """Quadric edge-collapse simplification in place (see mesh_decimate).
+
+        Stops at `target` triangles or once every remaining collapse would
+        put a vertex more than `max_rms` mm (RMS) off the faces it
+        replaces. Returns triangles removed.
+        """
+        n = len(self.tris)
+        v, f = mesh_decimate.decimate(self.verts, self.tris, target, max_rms,
+                                      feature_angle)
+        self._v, self._nv = v.astype(np.float32), len(v)
+        self._f, self._nf = f.astype(np.int32), len(f)
+        self._groups, self._dirty, self._xf = {}, False, None
+        self._flat = self._out = None
+        return n - self._nf
+
+    def check(self, quiet=False):
+        """Validate manifoldness/watertightness (see mesh_check). Returns the report."""
+        r = mesh_check.check(self.verts, self.tris)
+        if not quiet:
+            print(mesh_check.summary(r))
+        return r
+
+    # ── Output ───────────────────────────────────────────────────────────────
+
+    def save_stl(self, path, binary=True):
+        """Write binary STL (or ASCII with binary=False).
+
+        Skipped if `path` already holds exactly this mesh (see mesh_cache).
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        key = mesh_cache.content_key(self.verts, self.tris, 'stl', binary, name)
+        note = "  (unchanged)"
+        if not mesh_cache.output_current(path, key):
+            mesh_io.write_stl(path, self.verts, self.tris, binary=binary, name=name)
+            mesh_cache.record_output(path, key)
+            note = ""
+        kb = os.path.getsize(path) // 1024
+        print(f"  STL  {len(self.tris):>6} tris  {kb} KB  ->  {path}{note}")
+
+    def components(self):
+        """Split instance groups for 3MF output.
+
+        Returns (groups, (verts, tris)): the groups written as shared
+        3MF resources, and the welded rest of the mesh.  A group is shared
+        when its template is closed (no open edges) and it is either used
+        more than once or a part added with merge(instance=True); open or
+        one-off pieces are flattened into the main object.
+        """
+        shared, rest = [], []
+        for g in self._groups.values():
+            closed = mesh_check.check(g[1], g[2])['boundary_edges'] == 0
+            part = isinstance(g[0], Mesh)
+            (shared if closed and (len(g[3]) > 1 or part) else rest).append(g)
+        if not shared:
+            return [], (self.verts, self.tris)
+        v, f = self._flatten(rest)
+        if self._xf is not None:
+            v = _apply(self._xf, v)
+        return [(tv, tf, self._placed(xf)) for _, tv, tf, xf in shared], (v, f)
+
+    def save_3mf(self, path, extra=None, instanced=True):
+        """Write a 3MF. `extra` maps archive names to text.
+
+        With instanced=True, repeated closed features are written once as
+        component resources and placed by transform (see components());
+        a plate of merged parts becomes one build item per part.
+        Skipped if `path` already holds exactly this mesh (see mesh_cache).
+        """
+        comps, (verts, tris) = self.components() if instanced else ([], (self.verts, self.tris))
+        items = bool(comps) and not len(tris)
+        key = mesh_cache.content_key(verts, tris, '3mf', self.APP, extra, items,
+                                     arrays=[a for c in comps for a in c])
+        note = "  (unchanged)"
+        if not mesh_cache.output_current(path, key):
+            mesh_io.write_3mf(path, verts, tris, app=self.APP, extra=extra,
+                              components=comps, items=items)
+            mesh_cache.record_output(path, key)
+            note = ""
+        if comps:
+            copies = sum(len(xf) for _, _, xf in comps)
+            note = f"  ({len(comps)} shared, {copies} placed){note}"
+        kb = os.path.getsize(path) // 1024
+        print(f"  3MF  {len(self.tris):>6} tris  {kb} KB  ->  {path}{note}")
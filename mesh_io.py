@@ -0,0 +1,438 @@
+"""
+Mesh I/O — file writers for the generate_*.py scripts
+======================================================
+Array-level exporters that work on a float (n, 3) vertex array and an
+int (m, 3) triangle array.  They know nothing about the Mesh class, so
+they can be used on any indexed triangle data.
+
+STL:
+  - Binary (default): 80-byte header, uint32 count, then 50 bytes per
+    facet (normal, 3 vertices, attribute).  Facets are packed with NumPy
+    and written in fixed-size chunks so memory stays flat no matter how
+    many triangles the mesh has.
+  - ASCII: same chunking, one %-format per chunk instead of per facet.
+  - StlStream writes a binary STL block by block while the mesh is still
+    being generated, and patches the facet count in on close.
+  - Reading: binary files are memory-mapped as a structured array, so
+    only the chunks being looked at are paged in; ASCII files are parsed
+    line-block by line-block.  Either way iter_stl() yields (k, 3, 3)
+    triangle-corner blocks and never builds per-facet Python objects.
+
+3MF:
+  - The 3dmodel.model part is streamed into the zip entry in blocks of
+    <vertex>/<triangle> records, so the XML document is never held in
+    memory as a whole.  Coordinates use compact %g formatting.
+  - Optional base materials give per-triangle colors (pid/p1).
+  - Optional shared components: each repeated mesh is written once as an
+    object resource and placed by <component transform=...> entries of
+    one assembly object, or by <item transform=...> entries on the build
+    plate.  The file then grows with the number of copies only by one
+    short transform line each.
+  - ThreeMFStream takes vertices and triangles as they are generated:
+    vertices go straight into the zip entry, triangles are spooled to a
+    temporary file and appended after </vertices> on close.
+  - Reading: read_3mf() runs expat over the model part and returns the
+    stored meshes as one indexed (verts, faces) pair, e.g. to check() a
+    file a ThreeMFStream wrote.
+"""
+import array
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from xml.parsers import expat
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+CHUNK_TRIS = 65536      # facets packed per write
+
+STL_FACET = np.dtype([('normal', '<f4', (3,)),
+                      ('v', '<f4', (3, 3)),
+                      ('attr', '<u2')])
+assert STL_FACET.itemsize == 50
+
+_ASCII_FACET = (
+    "  facet normal %.6e %.6e %.6e\n"
+    "    outer loop\n"
+    "      vertex %.6e %.6e %.6e\n"
+    "      vertex %.6e %.6e %.6e\n"
+    "      vertex %.6e %.6e %.6e\n"
+    "    endloop\n  endfacet\n")
+
+
+def facet_normals(corners):
+    """Unit normals for a (k, 3, 3) array of triangle corners.
+
+    Degenerate triangles get (0, 0, 1).
+    """
+    c = np.asarray(corners, np.float64)
+    n = np.cross(c[:, 1] - c[:, 0], c[:, 2] - c[:, 0])
+    ln = np.linalg.norm(n, axis=1)
+    ok = ln > 1e-12
+    n[ok] /= ln[ok, None]
+    n[~ok] = (0.0, 0.0, 1.0)
+    return n
+
+
+def _chunks(verts, faces, chunk):
+    """Yield (corners, normals) for successive blocks of `chunk` faces."""
+    for s in range(0, len(faces), chunk):
+        corners = verts[faces[s:s + chunk]]
+        yield corners, facet_normals(corners)
+
+
+def write_stl(path, verts, faces, binary=True, name="mesh", chunk=CHUNK_TRIS):
+    """Write an STL file. Returns the number of facets written."""
+    verts = np.asarray(verts, np.float32)
+    faces = np.asarray(faces)
+    if binary:
+        with open(path, 'wb') as f:
+            header = f"binary STL {name}".encode('ascii', 'replace')[:80]
+            f.write(header.ljust(80, b' '))
+            f.write(np.uint32(len(faces)).tobytes())
+            buf = np.zeros(min(chunk, len(faces)), STL_FACET)
+            for corners, normals in _chunks(verts, faces, chunk):
+                k = len(corners)
+                buf['normal'][:k] = normals
+                buf['v'][:k] = corners
+                f.write(buf[:k].tobytes())
+    else:
+        with open(path, 'w') as f:
+            f.write(f"solid {name}\n")
+            for corners, normals in _chunks(verts, faces, chunk):
+                rows = np.hstack([normals, corners.reshape(-1, 9)])
+                f.write((_ASCII_FACET * len(rows)) % tuple(rows.ravel().tolist()))
+            f.write(f"endsolid {name}\n")
+    return len(faces)
+
+
+class StlStream:
+    """Binary STL written incrementally: write(corners) per block of facets.
+
+        with StlStream("big.stl") as out:
+            for corners in blocks:      # (k, 3, 3)
+                out.write(corners)
+    """
+
+    def __init__(self, path, name="mesh"):
+        self.path = path
+        self.count = 0
+        self._f = open(path, 'wb')
+        header = f"binary STL {name}".encode('ascii', 'replace')[:80]
+        self._f.write(header.ljust(80, b' ') + bytes(4))
+
+    def write(self, corners):
+        corners = np.asarray(corners, np.float32).reshape(-1, 3, 3)
+        buf = np.zeros(len(corners), STL_FACET)
+        buf['normal'] = facet_normals(corners)
+        buf['v'] = corners
+        self._f.write(buf.tobytes())
+        self.count += len(corners)
+
+    def close(self):
+        """Patch the facet count into the header and close. Returns it."""
+        if not self._f.closed:
+            self._f.seek(80)
+            self._f.write(np.uint32(self.count).tobytes())
+            self._f.close()
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_binary_stl(path):
+    """True if `path` is a binary STL (size matches the header's facet count).
+
+    ASCII files starting with "solid" are still told apart by size, since
+    some exporters write binary headers that begin with that word too.
+    """
+    size = os.path.getsize(path)
+    if size < 84:
+        return False
+    with open(path, 'rb') as f:
+        f.seek(80)
+        n = int(np.frombuffer(f.read(4), '<u4')[0])
+    return size == 84 + STL_FACET.itemsize * n
+
+
+def read_stl(path):
+    """(m, 3, 3) float32 triangle corners of a binary or ASCII STL.
+
+    A binary file comes back as a read-only view into a memory map; an
+    ASCII file is parsed into one array.
+    """
+    if is_binary_stl(path):
+        if os.path.getsize(path) == 84:
+            return np.empty((0, 3, 3), np.float32)
+        return np.memmap(path, STL_FACET, 'r', offset=84)['v']
+    return np.concatenate(list(iter_stl(path)) or [np.empty((0, 3, 3), np.float32)])
+
+
+def iter_stl(path, chunk=CHUNK_TRIS):
+    """Yield successive (k, 3, 3) float32 corner blocks of up to `chunk`
+    facets from a binary or ASCII STL, in file order."""
+    if is_binary_stl(path):
+        corners = read_stl(path)
+        for s in range(0, len(corners), chunk):
+            yield np.asarray(corners[s:s + chunk], np.float32)
+        return
+    with open(path, 'rb') as f:
+        rest = np.empty(0, np.float32)
+        while True:
+            # ~7 lines per facet; vertex lines are picked out and their
+            # numbers parsed in one go per block.  A facet cut by the block
+            # boundary is carried over to the next block.
+            lines = f.readlines(chunk * 7 * 40)
+            if not lines:
+                break
+            nums = b' '.join(line.split(b'vertex', 1)[1] for line in lines
+                             if line.lstrip().startswith(b'vertex')).split()
+            vals = np.concatenate([rest, np.array(nums, np.float32)])
+            k = len(vals) // 9 * 9
+            rest = vals[k:]
+            if k:
+                yield vals[:k].reshape(-1, 3, 3)
+        if len(rest):
+            raise ValueError(f"{path}: truncated ASCII STL facet")
+
+
+# ── 3MF ────────────────────────────────────────────────────────────────────
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    '  <Default Extension="rels"'
+    ' ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    '  <Default Extension="model"'
+    ' ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
+    '</Types>')
+
+RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships'
+    ' xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    '  <Relationship Target="/3D/3dmodel.model" Id="rel0"'
+    ' Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
+    '</Relationships>')
+
+_VERTEX = '<vertex x="%.7g" y="%.7g" z="%.7g"/>\n'
+_TRIANGLE = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+_TRIANGLE_P = '<triangle v1="%d" v2="%d" v3="%d" pid="%d" p1="%d"/>\n'
+
+
+def _stream_rows(out, fmt, rows, chunk, prop=None):
+    """Write `fmt` once per row of `rows`, `chunk` rows per write.
+
+    With `prop`, each row gets two extra columns: pid=1 and p1=prop[row].
+    """
+    for s in range(0, len(rows), chunk):
+        block = rows[s:s + chunk]
+        if prop is not None:
+            block = np.column_stack([block, np.ones(len(block), np.int64),
+                                     prop[s:s + chunk]])
+        out.write(((fmt * len(block)) % tuple(block.ravel().tolist())).encode())
+
+
+def _transform_attr(xf):
+    """3MF transform="m00 m01 m02 m10 ... m32" for a (4, 3) affine matrix."""
+    return ' transform="%s"' % ' '.join('%.7g' % x for x in np.asarray(xf).ravel().tolist())
+
+
+def _write_object(out, obj_id, verts, faces, chunk, name='', face_material=None):
+    out.write(f'<object id="{obj_id}" type="model"{name}>\n<mesh>\n<vertices>\n'.encode())
+    _stream_rows(out, _VERTEX, verts, chunk)
+    out.write(b'</vertices>\n<triangles>\n')
+    if face_material is not None:
+        _stream_rows(out, _TRIANGLE_P, faces, chunk, prop=np.asarray(face_material))
+    else:
+        _stream_rows(out, _TRIANGLE, faces, chunk)
+    out.write(b'</triangles>\n</mesh>\n</object>\n')
+
+
+def write_3mf(path, verts, faces, app="MeshGen", name=None, extra=None,
+              materials=None, face_material=None, components=None, items=False,
+              chunk=CHUNK_TRIS):
+    """Write a 3MF file. Returns the number of triangles it describes.
+
+    materials     : optional list of (r, g, b) base material colors
+    face_material : per-face index into `materials` (required with it)
+    components    : optional [(verts, faces, transforms)] shared meshes;
+                    each is written once as a resource and placed by its
+                    (k, 4, 3) transforms (p @ xf[:3] + xf[3])
+    items         : place the components as separate <item>s on the
+                    build plate instead of <component>s of one object
+    extra         : optional {archive name: text} written alongside
+    """
+    verts = np.asarray(verts, np.float32).reshape(-1, 3)
+    faces = np.asarray(faces).reshape(-1, 3)
+    components = [(np.asarray(v, np.float32).reshape(-1, 3), np.asarray(f).reshape(-1, 3),
+                   np.asarray(xf, np.float64).reshape(-1, 4, 3))
+                  for v, f, xf in components or ()]
+    if materials and components:
+        raise ValueError("write_3mf: materials and components cannot be combined")
+    obj_name = f' name="{name}"' if name else ''
+    head = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<model unit="millimeter"'
+            ' xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02"'
+            ' xmlns:m="http://schemas.microsoft.com/3dmanufacturing/material/2015/02">\n'
+            f'<metadata name="Application">{app}</metadata>\n'
+            '<resources>\n']
+    if materials:
+        head.append('<basematerials id="1">\n')
+        for i, (r, g, b) in enumerate(materials):
+            head.append(f'<base name="Color{i}" displaycolor="#{r:02X}{g:02X}{b:02X}"/>\n')
+        head.append('</basematerials>\n')
+
+    # Object ids: the main mesh (if any), then one per component mesh, then
+    # (component mode) the assembly object that the build item refers to
+    next_id = 2 if materials else 1
+    main_id = None
+    if len(faces) or not components:
+        main_id, next_id = next_id, next_id + 1
+    comp_ids = list(range(next_id, next_id + len(components)))
+    next_id += len(components)
+
+    n_tris = len(faces) + sum(len(f) * len(xf) for _, f, xf in components)
+    size = 60 * len(verts) + 70 * len(faces) + sum(
+        60 * len(v) + 70 * len(f) + 120 * len(xf) for v, f, xf in components)
+    # Zip64 is only needed (and only forced) when the part may pass 2 GB
+    big = size > 2**31 - 2**24
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', RELS_XML)
+        info = zipfile.ZipInfo('3D/3dmodel.model', time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, 'w', force_zip64=big) as out:
+            out.write(''.join(head).encode())
+            if main_id is not None:
+                _write_object(out, main_id, verts, faces, chunk,
+                              '' if components else obj_name,
+                              face_material if materials else None)
+            for cid, (cv, cf, _) in zip(comp_ids, components):
+                _write_object(out, cid, cv, cf, chunk)
+
+            # Placements: (object id, transform or None) pairs
+            placed = [] if main_id is None else [(main_id, None)]
+            for cid, (_, _, xf) in zip(comp_ids, components):
+                placed += [(cid, m) for m in xf]
+            build = []
+            if items or not components:
+                for oid, m in placed:
+                    attr = '' if m is None else _transform_attr(m)
+                    build.append(f'<item objectid="{oid}"{attr}/>\n')
+            else:
+                out.write(f'<object id="{next_id}" type="model"{obj_name}>\n'
+                          '<components>\n'.encode())
+                for s in range(0, len(placed), chunk):
+                    out.write(''.join(
+                        f'<component objectid="{oid}"'
+                        f'{"" if m is None else _transform_attr(m)}/>\n'
+                        for oid, m in placed[s:s + chunk]).encode())
+                out.write(b'</components>\n</object>\n')
+                build.append(f'<item objectid="{next_id}"/>\n')
+            out.write(('</resources>\n<build>\n' + ''.join(build) +
+                       '</build>\n</model>\n').encode())
+        for arc, text in (extra or {}).items():
+            zf.writestr(arc, text)
+    return n_tris
+
+
+class ThreeMFStream:
+    """Single-object 3MF written incrementally.
+
+    add_vertices(verts) appends vertices (numbered from 0 in call order);
+    add_faces(faces) appends triangles over any vertex written so far.
+    Memory holds one block at a time; close() finishes the archive.
+    """
+
+    def __init__(self, path, app="MeshGen", name=None, chunk=CHUNK_TRIS):
+        self.path = path
+        self.n_verts = self.n_tris = 0
+        self._chunk = chunk
+        self._tris = tempfile.TemporaryFile()
+        self._zf = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self._zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        self._zf.writestr('_rels/.rels', RELS_XML)
+        info = zipfile.ZipInfo('3D/3dmodel.model', time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        # Final size unknown up front, so Zip64 is always allowed
+        self._out = self._zf.open(info, 'w', force_zip64=True)
+        obj_name = f' name="{name}"' if name else ''
+        self._out.write(('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<model unit="millimeter"'
+                         ' xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+                         f'<metadata name="Application">{app}</metadata>\n'
+                         f'<resources>\n<object id="1" type="model"{obj_name}>\n'
+                         '<mesh>\n<vertices>\n').encode())
+
+    def add_vertices(self, verts):
+        verts = np.asarray(verts, np.float32).reshape(-1, 3)
+        _stream_rows(self._out, _VERTEX, verts, self._chunk)
+        self.n_verts += len(verts)
+
+    def add_faces(self, faces):
+        faces = np.asarray(faces, np.int64).reshape(-1, 3)
+        self._tris.write(faces.tobytes())
+        self.n_tris += len(faces)
+
+    def close(self):
+        """Append the spooled triangles and close the archive. Returns the
+        triangle count."""
+        if self._zf.fp is None:
+            return self.n_tris
+        self._out.write(b'</vertices>\n<triangles>\n')
+        self._tris.seek(0)
+        while True:
+            block = np.frombuffer(self._tris.read(self._chunk * 24), np.int64)
+            if not len(block):
+                break
+            _stream_rows(self._out, _TRIANGLE, block.reshape(-1, 3), self._chunk)
+        self._out.write(b'</triangles>\n</mesh>\n</object>\n</resources>\n'
+                        b'<build>\n<item objectid="1"/>\n</build>\n</model>\n')
+        self._out.close()
+        self._zf.close()
+        self._tris.close()
+        return self.n_tris
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_3mf(path):
+    """(verts, faces) of every mesh object in a 3MF, in file order.
+
+    Objects are concatenated with their vertex indices offset; component
+    and build-item transforms are not applied, so this suits single-object
+    files like the ones ThreeMFStream writes.
+    """
+    # Flat typed buffers: 12 bytes per vertex and 24 per triangle while
+    # parsing, no Python object per record
+    verts, faces, base = array.array('f'), array.array('q'), [0]
+
+    def start(name, attrs):
+        tag = name.rpartition(' ')[2]
+        if tag == 'vertex':
+            verts.extend((float(attrs['x']), float(attrs['y']), float(attrs['z'])))
+        elif tag == 'triangle':
+            b = base[0]
+            faces.extend((int(attrs['v1']) + b, int(attrs['v2']) + b, int(attrs['v3']) + b))
+        elif tag == 'mesh':
+            base[0] = len(verts) // 3
+
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.StartElementHandler = start
+    with zipfile.ZipFile(path) as zf, zf.open('3D/3dmodel.model') as f:
+        parser.ParseFile(f)
+    return (np.frombuffer(verts, np.float32).reshape(-1, 3),
+            np.frombuffer(faces, np.int64).reshape(-1, 3))
@@ -0,0 +1,74 @@
+"""
+Mesh Parts — build independent parts in parallel
+=================================================
+Multi-part generators describe their parts as a {name: builder} dict of
+module-level functions that each return a Mesh.  build_parts() runs the
+builders in a process pool, one part per task, and hands back the
+finished meshes.
+
+Workers only send back the part's class plus its arrays (Mesh.to_arrays:
+vertices, faces, instance templates and transforms).  NumPy arrays
+pickle as raw buffers, so the transfer costs one memcpy per part.
+Plates and assemblies are then composed in the parent by merging parts
+with offsets (Mesh.merge(part, offset=...)) instead of rebuilding them.
+
+With a cache_dir, parts already in the mesh_cache build cache are loaded
+instead of built, so only parts whose inputs changed go to the pool.
+
+Used by generate_rocket_launcher.py and generate_mario_block.py.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_cache
+
+
+def _run(builder):
+    """Worker: build one part and return it as plain arrays."""
+    m = builder()
+    return type(m), {k: np.ascontiguousarray(a) for k, a in m.to_arrays().items()}
+
+
+def _wrap(cls, arrays):
+    return cls.from_arrays(arrays)
+
+
+def build_parts(builders, workers=None, cache_dir=None):
+    """Run {name: builder} concurrently. Returns {name: Mesh}, same order.
+
+    workers   : pool size (default: one per part, capped at the CPU count);
+                1 builds everything in this process.
+    cache_dir : optional mesh_cache directory; parts whose fingerprint is
+                cached are loaded instead of built, new ones are stored.
+    """
+    done, todo, keys = {}, {}, {}
+    for name, fn in builders.items():
+        if cache_dir:
+            keys[name] = mesh_cache.fingerprint(fn)
+            m = mesh_cache.load_part(cache_dir, keys[name], mesh_cache.part_class(fn))
+            if m is not None:
+                print(f"  [cache] {name}")
+                done[name] = m
+                continue
+        todo[name] = fn
+
+    if workers is None:
+        workers = min(len(todo), os.cpu_count() or 1)
+    if workers <= 1 or len(todo) < 2:
+        built = {name: fn() for name, fn in todo.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            jobs = {name: ex.submit(_run, fn) for name, fn in todo.items()}
+            built = {name: _wrap(*job.result()) for name, job in jobs.items()}
+    if cache_dir:
+        for name, m in built.items():
+            mesh_cache.store_part(cache_dir, keys[name], m)
+    done.update(built)
+    return {name: done[name] for name in builders}
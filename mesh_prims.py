@@ -0,0 +1,206 @@
+"""
+Mesh Prims — cached round primitives, stamped as translated copies
+===================================================================
+Round primitives (cylinders, tubes, disks, cones) are built from rings
+around a local axis w, with the ring in the (u, v) plane:
+
+    point i of a ring = (r cos(2 pi i / segs), r sin(2 pi i / segs), w)
+
+  - unit_circle(segs) computes the cos/sin table once per segment count.
+  - Each primitive template (solid_cylinder(r, h, segs), tube(...), ...)
+    is built once per distinct argument set, as an indexed vertex/face
+    array pair at the origin, and reused from then on.
+  - stamp(template, offsets, axis) places any number of copies in one
+    array operation.  The template's (u, v, w) columns are mapped to world
+    axes so that w runs along `axis` (see AXES).  The same placement can be
+    kept as a transform list (placements()) instead of baked geometry,
+    which is how Mesh tracks instances for 3MF components.
+
+Winding matches the quad()/tri() ring code these templates replace:
+band quads are (a[i], a[j], b[j], b[i]), fans are (apex, p[i], p[j]),
+and flip=True reverses either.
+
+    studs = mesh_prims.solid_cylinder(2.25, 1.8, m.segs_for(2.25))
+    m.add_instances(studs, centers, axis='y')
+"""
+import functools
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+# World column k of a stamped copy comes from local column AXES[axis][k]:
+#   'x' -> (w, u, v)    'y' -> (u, w, v)    'z' -> (u, v, w)
+AXES = {'x': (2, 0, 1), 'y': (0, 2, 1), 'z': (0, 1, 2)}
+
+
+@functools.lru_cache(maxsize=None)
+def unit_circle(segs):
+    """(segs, 2) read-only table of (cos, sin) at 2*pi*i/segs."""
+    a = 2 * np.pi * np.arange(segs) / segs
+    c = np.stack([np.cos(a), np.sin(a)], axis=1)
+    c.flags.writeable = False
+    return c
+
+
+class Template:
+    """Indexed primitive under construction, in local (u, v, w) coordinates.
+
+    Rings and centre points are shared: asking twice for the ring of
+    radius r at height w returns the same vertex indices.
+    """
+
+    def __init__(self, segs):
+        self.segs = segs
+        self._pts = []
+        self._faces = []
+        self._index = {}
+        self._n = 0
+        i = np.arange(segs)
+        self._i, self._j = i, (i + 1) % segs
+
+    def ring(self, r, w):
+        """First vertex index of the ring of radius `r` at height `w`."""
+        key = ('ring', r, w)
+        if key not in self._index:
+            c = unit_circle(self.segs)
+            pts = np.empty((self.segs, 3))
+            pts[:, :2] = r * c
+            pts[:, 2] = w
+            self._index[key] = self._add(pts)
+        return self._index[key]
+
+    def point(self, w):
+        """Index of the axis point at height `w`."""
+        key = ('point', w)
+        if key not in self._index:
+            self._index[key] = self._add(np.array([[0.0, 0.0, w]]))
+        return self._index[key]
+
+    def _add(self, pts):
+        first = self._n
+        self._pts.append(pts)
+        self._n += len(pts)
+        return first
+
+    def band(self, r0, w0, r1, w1, flip=False):
+        """Quad strip from ring (r0, w0) to ring (r1, w1)."""
+        a, b = self.ring(r0, w0), self.ring(r1, w1)
+        i, j = self._i, self._j
+        if flip:
+            i, j = j, i
+        # quad(a_i, a_j, b_j, b_i) -> (a_i, a_j, b_j), (a_i, b_j, b_i)
+        q = np.stack([a + i, a + j, b + j, b + i], axis=1)
+        self._faces.append(np.concatenate([q[:, [0, 1, 2]], q[:, [0, 2, 3]]]))
+
+    def fan(self, r, w, apex_w=None, flip=False):
+        """Triangle fan from the ring (r, w) to the axis point at `apex_w`
+        (default `w`: a flat disk)."""
+        p = self.ring(r, w)
+        c = self.point(w if apex_w is None else apex_w)
+        i, j = self._i, self._j
+        if flip:
+            i, j = j, i
+        self._faces.append(np.stack([np.full(self.segs, c), p + i, p + j], axis=1))
+
+    def arrays(self):
+        """(verts, faces) as read-only float64 / int64 arrays."""
+        v = np.concatenate(self._pts)
+        f = np.concatenate(self._faces)
+        v.flags.writeable = f.flags.writeable = False
+        return v, f
+
+
+# ── Templates ────────────────────────────────────────────────────────────────
+# Cached per argument set; callers must not modify the returned arrays.
+
+@functools.lru_cache(maxsize=None)
+def disk(r, segs, flip=False):
+    """Flat disk at w = 0."""
+    t = Template(segs)
+    t.fan(r, 0.0, flip=flip)
+    return t.arrays()
+
+
+@functools.lru_cache(maxsize=None)
+def wall(r, h, segs):
+    """Open cylinder wall from w = 0 to w = h."""
+    t = Template(segs)
+    t.band(r, 0.0, r, h)
+    return t.arrays()
+
+
+@functools.lru_cache(maxsize=None)
+def solid_cylinder(r, h, segs, flip_caps=False):
+    """Capped cylinder; caps are (ctr, p[i], p[j]) on top and reversed
+    on the bottom, or the other way round with flip_caps."""
+    t = Template(segs)
+    t.band(r, 0.0, r, h)
+    t.fan(r, h, flip=flip_caps)
+    t.fan(r, 0.0, flip=not flip_caps)
+    return t.arrays()
+
+
+@functools.lru_cache(maxsize=None)
+def tube(ro, ri, h, segs):
+    """Hollow tube: outer wall, inner wall, bottom and top annulus."""
+    t = Template(segs)
+    t.band(ro, 0.0, ro, h)
+    t.band(ri, 0.0, ri, h, flip=True)
+    t.band(ro, 0.0, ri, 0.0, flip=True)
+    t.band(ro, h, ri, h)
+    return t.arrays()
+
+
+@functools.lru_cache(maxsize=None)
+def cone(r, h, rings, segs):
+    """Cone from radius `r` at w = 0 to a point at w = h, in `rings`
+    straight steps (open base)."""
+    t = Template(segs)
+    r_prev, w_prev = r, 0.0
+    for k in range(1, rings + 1):
+        rk = r * (1 - k / rings)
+        wk = h * k / rings
+        if rk < 0.001:
+            t.fan(r_prev, w_prev, apex_w=h)
+            break
+        t.band(r_prev, w_prev, rk, wk)
+        r_prev, w_prev = rk, wk
+    return t.arrays()
+
+
+# ── Stamping ─────────────────────────────────────────────────────────────────
+# Placements are 3MF-style affine transforms: (k, 4, 3) arrays whose rows
+# 0-2 are the linear part and row 3 the translation, so that a point p
+# lands at  p @ xf[:3] + xf[3]  (the 3MF <item>/<component> convention).
+
+def placements(offsets, axis='z'):
+    """(k, 4, 3) transforms turning the local w axis into `axis`, then
+    translating by each of `offsets`."""
+    offsets = np.asarray(offsets, np.float64).reshape(-1, 3)
+    xf = np.zeros((len(offsets), 4, 3))
+    xf[:, AXES[axis], [0, 1, 2]] = 1.0
+    xf[:, 3] = offsets
+    return xf
+
+
+def transform(template, transforms):
+    """Copies of `template` = (verts, faces), one per transform.
+
+    Returns (verts, faces) with copy k's vertices at rows k*n .. k*n+n-1.
+    """
+    verts, faces = template
+    xf = np.asarray(transforms, np.float64).reshape(-1, 4, 3)
+    n = len(verts)
+    out_v = (np.asarray(verts, np.float64) @ xf[:, :3] + xf[:, 3:]).reshape(-1, 3)
+    shift = (np.arange(len(xf)) * n)[:, None, None]
+    out_f = (np.asarray(faces, np.int64)[None, :, :] + shift).reshape(-1, 3)
+    return out_v, out_f
+
+
+def stamp(template, offsets, axis='z'):
+    """Copies of `template` with its w axis along `axis`, one per offset."""
+    return transform(template, placements(offsets, axis))
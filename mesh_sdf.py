@@ -0,0 +1,307 @@
+"""
+Mesh SDF — implicit-surface modelling for organic generators
+=============================================================
+Shapes are signed distance fields: negative inside, positive outside.
+Primitives and combinators are small picklable objects, each mapping an
+(n, 3) point array to n distances in one vectorized call:
+
+    head = mesh_sdf.SmoothUnion(4.0,
+                                mesh_sdf.Ellipsoid((0, 10, 0), (28, 35, 55)),
+                                mesh_sdf.Capsule((0, -25, -30), (0, -50, -30), 6, 3.6))
+    wrinkled = mesh_sdf.Displace(head, wrinkles, margin=3.0)   # wrinkles(p) -> mm
+    verts, faces = mesh_sdf.polygonize(wrinkled, cell=0.8)
+
+Smooth unions fuse parts with a fillet of size k instead of letting them
+overlap, so the result is always a single closed surface.
+
+polygonize():
+  - The grid covers the field's bounds (plus a margin) with cubic cells.
+    It is cut into z slabs; each slab (field values and its triangles)
+    is independent and may run in its own worker process.
+  - Each cell is split into 6 tetrahedra around its main diagonal
+    (marching tetrahedra).  A tetrahedron with 1 or 3 corners inside
+    gives one triangle, one with 2 gives a quad.  All cells of a slab are
+    handled in array form, one pass per tetrahedron.
+  - Every vertex lies on a lattice edge and is keyed by that edge, so
+    slabs and neighbouring cells share vertices exactly: the output is
+    watertight by construction, with no ambiguous cases to resolve.
+  - Triangles are wound outward from the integer lattice geometry of
+    their tetrahedron, never from (possibly tiny) triangle normals.
+
+Marching tetrahedra gives roughly twice the triangles of marching cubes
+on the same grid; mesh_decimate brings the count back down.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+BLOCK_POINTS = 1 << 20   # field evaluations per call
+SLAB_CELLS = 1 << 19     # grid cells per slab (one worker task)
+
+
+# ── Fields ───────────────────────────────────────────────────────────────────
+# Each field has __call__(p) -> distances for an (n, 3) float64 array and
+# `bounds`, an ((x0, y0, z0), (x1, y1, z1)) box containing its surface.
+
+def _box(lo, hi):
+    return np.asarray(lo, np.float64), np.asarray(hi, np.float64)
+
+
+class Sphere:
+    def __init__(self, center, r):
+        self.c, self.r = np.asarray(center, np.float64), float(r)
+        self.bounds = _box(self.c - r, self.c + r)
+
+    def __call__(self, p):
+        return np.linalg.norm(p - self.c, axis=1) - self.r
+
+
+class Ellipsoid:
+    """Axis-aligned ellipsoid (distance is approximate away from the surface)."""
+
+    def __init__(self, center, radii):
+        self.c, self.r = np.asarray(center, np.float64), np.asarray(radii, np.float64)
+        self.bounds = _box(self.c - self.r, self.c + self.r)
+
+    def __call__(self, p):
+        q = p - self.c
+        k0 = np.linalg.norm(q / self.r, axis=1)
+        k1 = np.linalg.norm(q / (self.r * self.r), axis=1)
+        return k0 * (k0 - 1.0) / np.maximum(k1, 1e-12)
+
+
+class Capsule:
+    """Segment a-b swept by a radius going linearly from ra to rb."""
+
+    def __init__(self, a, b, ra, rb=None):
+        self.a, self.b = np.asarray(a, np.float64), np.asarray(b, np.float64)
+        self.ra = float(ra)
+        self.rb = self.ra if rb is None else float(rb)
+        r = max(self.ra, self.rb)
+        self.bounds = _box(np.minimum(self.a, self.b) - r, np.maximum(self.a, self.b) + r)
+
+    def __call__(self, p):
+        ba = self.b - self.a
+        pa = p - self.a
+        h = np.clip(pa @ ba / (ba @ ba), 0.0, 1.0)
+        return np.linalg.norm(pa - h[:, None] * ba, axis=1) - (self.ra + (self.rb - self.ra) * h)
+
+
+class Box:
+    """Axis-aligned box from corner `lo` to corner `hi`."""
+
+    def __init__(self, lo, hi):
+        self.bounds = _box(lo, hi)
+        self.c = (self.bounds[0] + self.bounds[1]) / 2
+        self.h = (self.bounds[1] - self.bounds[0]) / 2
+
+    def __call__(self, p):
+        q = np.abs(p - self.c) - self.h
+        return (np.linalg.norm(np.maximum(q, 0.0), axis=1)
+                + np.minimum(q.max(axis=1), 0.0))
+
+
+def _smin(a, b, k):
+    """Polynomial smooth minimum with blend width k (k = 0: plain min)."""
+    if k <= 0:
+        return np.minimum(a, b)
+    h = np.clip(0.5 + 0.5 * (b - a) / k, 0.0, 1.0)
+    return b + (a - b) * h - k * h * (1.0 - h)
+
+
+class SmoothUnion:
+    """Union of `fields` blended with fillets of size `k` (mm)."""
+
+    def __init__(self, k, *fields):
+        self.k, self.fields = float(k), fields
+        lo = np.min([f.bounds[0] for f in fields], axis=0)
+        hi = np.max([f.bounds[1] for f in fields], axis=0)
+        self.bounds = _box(lo - self.k, hi + self.k)
+
+    def __call__(self, p):
+        d = self.fields[0](p)
+        for f in self.fields[1:]:
+            d = _smin(d, f(p), self.k)
+        return d
+
+
+def Union(*fields):
+    """Plain (sharp) union."""
+    return SmoothUnion(0.0, *fields)
+
+
+class Difference:
+    """`a` with `b` cut away, edges rounded by `k`."""
+
+    def __init__(self, a, b, k=0.0):
+        self.a, self.b, self.k = a, b, float(k)
+        self.bounds = a.bounds
+
+    def __call__(self, p):
+        return -_smin(-self.a(p), self.b(p), self.k)
+
+
+class Displace:
+    """`field` pushed outward by fn(p) mm (fn: (n, 3) -> (n,), picklable).
+
+    `margin` is the largest |fn| expected; it widens the bounds.
+    """
+
+    def __init__(self, field, fn, margin=0.0):
+        self.field, self.fn = field, fn
+        lo, hi = field.bounds
+        self.bounds = _box(lo - margin, hi + margin)
+
+    def __call__(self, p):
+        return self.field(p) - self.fn(p)
+
+
+# ── Marching tetrahedra ──────────────────────────────────────────────────────
+# Cell corner c sits at lattice offset (c & 1, c >> 1 & 1, c >> 2 & 1).
+# The 6 tetrahedra share the 0-7 diagonal; every tetrahedron edge then
+# runs along a non-negative offset, so it is named by its lower lattice
+# point and that offset (3 bits).
+
+_OFF = np.array([[c & 1, c >> 1 & 1, c >> 2 & 1] for c in range(8)], np.int64)
+_TETS = np.array([[0, 1, 3, 7], [0, 3, 2, 7], [0, 2, 6, 7],
+                  [0, 6, 4, 7], [0, 4, 5, 7], [0, 5, 1, 7]])
+
+
+def _det(a, b, c):
+    return np.einsum('ij,ij->i', a, np.cross(b, c))
+
+
+def _slab(field, origin, cell, shape, k0, k1):
+    """Triangles of the cells between lattice planes k0 and k1.
+
+    Returns (keys, points, tris): one row per emitted vertex (lattice edge
+    key, position) and triangles as (t, 3) indices into those rows.
+    """
+    nx, ny, _ = shape
+    nz = k1 - k0 + 1
+    xs = origin[0] + cell * np.arange(nx)
+    ys = origin[1] + cell * np.arange(ny)
+    zs = origin[2] + cell * np.arange(k0, k1 + 1)
+
+    # Field values, a few z planes per call
+    vals = np.empty((nx, ny, nz))
+    per = max(1, BLOCK_POINTS // (nx * ny))
+    gx, gy = np.meshgrid(xs, ys, indexing='ij')
+    for a in range(0, nz, per):
+        b = min(a + per, nz)
+        p = np.empty((nx, ny, b - a, 3))
+        p[..., 0] = gx[..., None]
+        p[..., 1] = gy[..., None]
+        p[..., 2] = zs[a:b]
+        vals[:, :, a:b] = field(p.reshape(-1, 3)).reshape(nx, ny, b - a)
+    # A value of exactly 0 counts as outside; nudge it so no vertex lands
+    # on a lattice point
+    vals[vals == 0] = 1e-9 * cell
+
+    # Cells whose corners are not all on one side
+    corner = np.stack([vals[o[0]:nx - 1 + o[0], o[1]:ny - 1 + o[1], o[2]:nz - 1 + o[2]]
+                       for o in _OFF], axis=-1)
+    inside = corner < 0
+    n_in = inside.sum(axis=-1)
+    ci = np.argwhere((n_in > 0) & (n_in < 8))
+    cv, cin = corner[tuple(ci.T)], inside[tuple(ci.T)]
+    ci[:, 2] += k0
+
+    keys, points, tris = [], [], []
+    count = 0
+
+    def edge_vertex(rows, c_p, c_q):
+        """Vertex on the lattice edge between corners c_p, c_q of cells `rows`."""
+        nonlocal count
+        lp, lq = ci[rows] + _OFF[c_p], ci[rows] + _OFF[c_q]
+        vp, vq = cv[rows, c_p], cv[rows, c_q]
+        swap = (lq < lp).any(axis=1)                  # name the edge by its lower end
+        lo = np.where(swap[:, None], lq, lp)
+        d = np.where(swap[:, None], lp - lq, lq - lp)
+        vlo, vhi = np.where(swap, vq, vp), np.where(swap, vp, vq)
+        gid = lo[:, 0] + nx * (lo[:, 1] + ny * lo[:, 2])
+        keys.append(gid * 8 + d[:, 0] + 2 * d[:, 1] + 4 * d[:, 2])
+        t = vlo / (vlo - vhi)
+        points.append(origin + cell * (lo + t[:, None] * d))
+        idx = count + np.arange(len(rows))
+        count += len(rows)
+        return idx
+
+    rows_all = np.arange(len(ci))
+    for tet in _TETS:
+        tin = cin[:, tet]
+        k = tin.sum(axis=1)
+
+        # One corner on its own side: a single triangle around it
+        for lone_inside in (True, False):
+            sel = k == (1 if lone_inside else 3)
+            if not sel.any():
+                continue
+            rows = rows_all[sel]
+            lone = np.argmax(tin[sel] == lone_inside, axis=1)
+            others = (lone[:, None] + np.arange(1, 4)) % 4
+            c = [tet[lone]] + [tet[others[:, i]] for i in range(3)]
+            e = [edge_vertex(rows, c[0], c[i]) for i in (1, 2, 3)]
+            # Wind so the normal points away from the inside corner(s)
+            D = _det(*(_OFF[c[i]] - _OFF[c[0]] for i in (1, 2, 3)))
+            flip = (D < 0) if lone_inside else (D > 0)
+            tri = np.stack(e, axis=1)
+            tri[flip] = tri[flip][:, [0, 2, 1]]
+            tris.append(tri)
+
+        # Two in, two out: a quad between the pairs
+        sel = k == 2
+        if sel.any():
+            rows = rows_all[sel]
+            order = np.argsort(~tin[sel], axis=1, kind='stable')   # inside first
+            a, b, c, d = (tet[order[:, i]] for i in range(4))
+            ac, ad = edge_vertex(rows, a, c), edge_vertex(rows, a, d)
+            bd, bc = edge_vertex(rows, b, d), edge_vertex(rows, b, c)
+            D = _det(_OFF[b] - _OFF[a], _OFF[c] - _OFF[a], _OFF[d] - _OFF[a])
+            q = np.stack([ac, ad, bd, bc], axis=1)
+            flip = D < 0
+            q[flip] = q[flip][:, [0, 3, 2, 1]]
+            tris.append(q[:, [0, 1, 2]])
+            tris.append(q[:, [0, 2, 3]])
+
+    if not keys:
+        return np.empty(0, np.int64), np.empty((0, 3)), np.empty((0, 3), np.int64)
+    return np.concatenate(keys), np.concatenate(points), np.concatenate(tris)
+
+
+def polygonize(field, cell, bounds=None, workers=None):
+    """Triangle mesh of the zero surface of `field` on a grid of `cell` mm.
+
+    Returns (verts, faces): float64 (n, 3) and int64 (m, 3), closed and
+    wound outward.  `bounds` defaults to field.bounds; a two-cell margin
+    is added so the surface never touches the grid edge.  Slabs run in
+    `workers` processes (default: one per CPU).
+    """
+    lo, hi = (np.asarray(b, np.float64) for b in (bounds or field.bounds))
+    origin = lo - 2 * cell
+    shape = tuple(int(n) for n in np.ceil((hi - lo) / cell).astype(np.int64) + 5)
+    nx, ny, nz = shape
+    per = max(1, SLAB_CELLS // (nx * ny))
+    slabs = [(k, min(k + per, nz - 1)) for k in range(0, nz - 1, per)]
+
+    jobs = [(field, origin, cell, shape, k0, k1) for k0, k1 in slabs]
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        parts = [_slab(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(_slab, *zip(*jobs)))
+
+    # One vertex per lattice edge key, shared across cells and slabs
+    keys = np.concatenate([p[0] for p in parts])
+    points = np.concatenate([p[1] for p in parts])
+    offs = np.cumsum([0] + [len(p[0]) for p in parts[:-1]])
+    tris = np.concatenate([p[2] + o for p, o in zip(parts, offs)])
+    uniq, first, inv = np.unique(keys, return_index=True, return_inverse=True)
+    return points[first], inv.ravel()[tris]
@@ -0,0 +1,179 @@
+"""
+Mesh Stats — print-planning numbers for STL files
+==================================================
+Triangle count, bounding box, volume and surface area of any binary or
+ASCII STL, without a slicer:
+
+    python mesh_stats.py barrel.stl rocket.stl spring.stl
+    python mesh_stats.py --diff old/barrel.stl barrel.stl
+    python mesh_stats.py --json *.stl
+
+Files are read with mesh_io.iter_stl(): binary STLs are memory-mapped and
+ASCII STLs streamed, one block of facets at a time.  Every statistic is
+a running sum or min/max over those blocks, so memory stays flat however
+big the file is.
+
+Volume is the divergence-theorem sum over the facet soup (exact for a
+closed, outward-facing shell; see mesh_check for the indexed validator).
+
+--diff compares two versions of a part: the change in each statistic,
+plus how many facets are identical in both files.  Facets are matched
+by a 64-bit hash of their exact float32 corners (rotated to a canonical
+starting corner, so winding still counts), so only two hash arrays are
+ever held, never the geometry.
+"""
+import argparse
+import json
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_io
+
+# Odd 64-bit multipliers for the facet hash
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9],
+                np.uint64)
+
+
+# ── Statistics ───────────────────────────────────────────────────────────────
+
+def stats(path, chunk=mesh_io.CHUNK_TRIS):
+    """Statistics of one STL file as a plain dict.
+
+    Keys: path, binary, bytes, tris, min, max, size (mm, [x, y, z]),
+    volume (mm^3), area (mm^2), degenerate (zero-area facets).
+    """
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    tris = degenerate = 0
+    volume = area = 0.0
+    for corners in mesh_io.iter_stl(path, chunk):
+        c = corners.astype(np.float64)
+        lo = np.minimum(lo, c.min(axis=(0, 1)))
+        hi = np.maximum(hi, c.max(axis=(0, 1)))
+        cross = np.cross(c[:, 1] - c[:, 0], c[:, 2] - c[:, 0])
+        area2 = np.linalg.norm(cross, axis=1)
+        volume += float(np.einsum('ij,ij->', c[:, 0], np.cross(c[:, 1], c[:, 2]))) / 6.0
+        area += float(area2.sum()) / 2.0
+        degenerate += int((area2 < 2e-12).sum())
+        tris += len(c)
+    if not tris:
+        lo = hi = np.zeros(3)
+    return {
+        'path': path,
+        'binary': mesh_io.is_binary_stl(path),
+        'bytes': os.path.getsize(path),
+        'tris': tris,
+        'min': lo.tolist(),
+        'max': hi.tolist(),
+        'size': (hi - lo).tolist(),
+        'volume': volume,
+        'area': area,
+        'degenerate': degenerate,
+    }
+
+
+def facet_hashes(path, chunk=mesh_io.CHUNK_TRIS):
+    """Sorted uint64 hash per facet of an STL (exact corners, winding kept)."""
+    out = []
+    for corners in mesh_io.iter_stl(path, chunk):
+        # -0.0 + 0.0 == +0.0, so both zeros hash alike
+        bits = (corners + np.float32(0)).view(np.uint32).astype(np.uint64)
+        keys = (bits * _MIX).sum(axis=2)               # (k, 3) per corner
+        # Rotate each facet so its smallest corner key comes first
+        start = keys.argmin(axis=1)
+        order = (start[:, None] + np.arange(3)) % 3
+        keys = np.take_along_axis(keys, order, axis=1)
+        keys = keys ^ (keys >> np.uint64(29))
+        out.append((keys * _MIX).sum(axis=1))
+    return np.sort(np.concatenate(out)) if out else np.empty(0, np.uint64)
+
+
+def diff(path_a, path_b, chunk=mesh_io.CHUNK_TRIS):
+    """Compare two STL files. Returns {'a': stats, 'b': stats, 'delta': {...},
+    'shared': facets present in both, 'only_a', 'only_b'}."""
+    a, b = stats(path_a, chunk), stats(path_b, chunk)
+    delta = {k: b[k] - a[k] for k in ('tris', 'bytes', 'volume', 'area')}
+    delta['size'] = [y - x for x, y in zip(a['size'], b['size'])]
+    ua, ca = np.unique(facet_hashes(path_a, chunk), return_counts=True)
+    ub, cb = np.unique(facet_hashes(path_b, chunk), return_counts=True)
+    _, ia, ib = np.intersect1d(ua, ub, assume_unique=True, return_indices=True)
+    shared = int(np.minimum(ca[ia], cb[ib]).sum())
+    return {'a': a, 'b': b, 'delta': delta, 'shared': shared,
+            'only_a': a['tris'] - shared, 'only_b': b['tris'] - shared}
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+
+def _row(s):
+    x, y, z = s['size']
+    kind = "bin" if s['binary'] else "asc"
+    return (f"  {os.path.basename(s['path']):<32} {kind} {s['tris']:>8} "
+            f"{x:>8.2f} x {y:>7.2f} x {z:>7.2f}  {s['volume'] / 1000:>9.3f} "
+            f"{s['area'] / 100:>9.2f}")
+
+
+def _header():
+    return (f"  {'file':<32} fmt {'tris':>8} {'size (mm)':>29}  {'vol cm3':>9} "
+            f"{'area cm2':>9}")
+
+
+def _pct(d, base):
+    return f"{100.0 * d / base:+.2f}%" if base else "n/a"
+
+
+def print_diff(r):
+    a, b, d = r['a'], r['b'], r['delta']
+    print(_header())
+    print(_row(a))
+    print(_row(b))
+    print(f"  tris    {d['tris']:+d}")
+    print(f"  volume  {d['volume'] / 1000:+.4f} cm3  ({_pct(d['volume'], a['volume'])})")
+    print(f"  area    {d['area'] / 100:+.4f} cm2  ({_pct(d['area'], a['area'])})")
+    print("  size    " + " x ".join(f"{v:+.3f}" for v in d['size']) + " mm")
+    print(f"  facets  {r['shared']} identical, {r['only_a']} only in A, "
+          f"{r['only_b']} only in B")
+    for s in (a, b):
+        if s['degenerate']:
+            print(f"  note: {os.path.basename(s['path'])} has {s['degenerate']} "
+                  "degenerate facets")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bounding box, volume, area and "
+                                             "triangle count of STL files.")
+    ap.add_argument('files', nargs='+', help="STL files (binary or ASCII)")
+    ap.add_argument('--diff', action='store_true',
+                    help="compare exactly two files (A then B)")
+    ap.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    missing = [p for p in args.files if not os.path.isfile(p)]
+    if missing:
+        ap.error(f"no such file: {', '.join(missing)}")
+    if args.diff:
+        if len(args.files) != 2:
+            ap.error("--diff takes exactly two files")
+        r = diff(*args.files)
+        if args.json:
+            print(json.dumps(r, indent=2))
+        else:
+            print_diff(r)
+        return
+
+    results = [stats(p) for p in args.files]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(_header())
+    for s in results:
+        print(_row(s))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Mesh Stream — bounded-memory mesh sink for very high-resolution builds
+======================================================================
+MeshSink takes geometry the way mesh_core.Mesh does (add_geometry(),
+v() / tri() / quad()) but never holds the whole model.  Finished
+triangles go straight to a binary STL and/or a 3MF on disk
+(mesh_io.StlStream / ThreeMFStream).
+
+    with mesh_stream.MeshSink("spring.stl", "spring.3mf", app="SpringGen") as sink:
+        for verts, faces in mesh_sweep.coil_blocks(...):
+            sink.add_geometry(verts, faces)
+
+Welding happens in a sliding window instead of over the whole mesh:
+  - Geometry is flushed in blocks (add_geometry() calls, or BLOCK_TRIS
+    staged point-by-point triangles).
+  - Each block is welded (weld_vertices) together with the last `window`
+    vertices already written.  Points matching a window vertex reuse its
+    index; the rest are written as new vertices and join the window.
+  - Window vertices a block reuses move to its newest end, so a point
+    shared all along a long build (e.g. the centre of a fan cap emitted
+    row by row) stays welded.
+  - Every sweep-style primitive here only shares vertices between
+    neighbouring rings, so a window a few rings deep welds the model
+    exactly like Mesh would.  Points that come back after leaving the
+    window (e.g. a fan cap over the first ring of a long grid, emitted
+    only at the end) get new vertices; the STL is unaffected, the 3MF
+    shows them as a seam.
+
+Memory is one block plus the window.  What a sink cannot do is look at
+the whole mesh: no floor_to_z0(), decimate() or check().  Set `offset`
+before adding geometry to move the output instead.
+
+The files are written as <path>.part and renamed on close(); leaving
+the `with` block through an exception deletes them instead (discard()).
+"""
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_core
+import mesh_io
+
+WINDOW = 16384       # recently written vertices kept for welding
+BLOCK_TRIS = 32768   # staged v()/tri() triangles per flush
+TMP_SUFFIX = ".part"  # outputs are written as <path>.part until close()
+
+
+class MeshSink:
+    """Write-only mesh that streams to STL / 3MF with a windowed weld."""
+
+    WELD_EPS = mesh_core.WELD_EPS
+
+    def __init__(self, stl=None, threemf=None, app="MeshGen", name=None,
+                 offset=(0.0, 0.0, 0.0), window=WINDOW):
+        if stl is None and threemf is None:
+            raise ValueError("MeshSink: give an STL and/or a 3MF path")
+        self.offset = offset
+        self.window = window
+        self.n_verts = self.n_tris = 0
+        # Written under a temporary name and renamed by close(), so a build
+        # that fails part-way never leaves a truncated file behind
+        self._paths = [p for p in (stl, threemf) if p]
+        self._stl = mesh_io.StlStream(stl + TMP_SUFFIX, name or "mesh") if stl else None
+        self._3mf = (mesh_io.ThreeMFStream(threemf + TMP_SUFFIX, app, name)
+                     if threemf else None)
+        self._win_v = np.empty((0, 3), np.float32)   # window positions ...
+        self._win_i = np.empty(0, np.int64)          # ... and output indices
+        self._sv = []   # staged vertices from v()/tri()
+        self._sf = []   # staged faces from tri()
+
+    # ── Input ────────────────────────────────────────────────────────────────
+
+    def add_geometry(self, verts, faces):
+        """Weld and write one block: vertices plus faces indexing them."""
+        self._flush()
+        self._emit(verts, faces)
+
+    def v(self, x, y, z):
+        """Stage a raw vertex and return its index within the staged block."""
+        self._sv.append((x, y, z))
+        return len(self._sv) - 1
+
+    def tri(self, a, b, c):
+        n = len(self._sv)
+        self._sv += (a, b, c)
+        self._sf.append((n, n + 1, n + 2))
+        if len(self._sf) >= BLOCK_TRIS:
+            self._flush()
+
+    def quad(self, a, b, c, d):
+        self.tri(a, b, c)
+        self.tri(a, c, d)
+
+    def segs_for(self, r):
+        """Segment count for a circle of radius `r` (see mesh_core.segments_for)."""
+        return mesh_core.segments_for(r, mesh_core.Mesh.CHORD_TOL)
+
+    # ── Window weld ──────────────────────────────────────────────────────────
+
+    def _flush(self):
+        if self._sf:
+            sv, sf, self._sv, self._sf = self._sv, self._sf, [], []
+            self._emit(sv, sf)
+
+    def _emit(self, verts, faces):
+        verts = np.asarray(verts, np.float32).reshape(-1, 3) + np.asarray(self.offset, np.float32)
+        faces = np.asarray(faces, np.int64).reshape(-1, 3)
+        w = len(self._win_v)
+        pts = np.concatenate([self._win_v, verts])
+        _, _, remap = mesh_core.weld_vertices(pts, np.empty((0, 3), np.int64),
+                                              self.WELD_EPS)
+        # Survivor of each weld group = its lowest input index; window
+        # survivors keep their output index, the others are new
+        first = np.full(remap.max() + 1 if len(remap) else 0, len(pts), np.int64)
+        np.minimum.at(first, remap, np.arange(len(pts)))
+        new = first >= w
+        out = np.empty(len(first), np.int64)
+        out[~new] = self._win_i[first[~new]]
+        out[new] = self.n_verts + np.arange(new.sum())
+        new_v = pts[first[new]]
+        self.n_verts += len(new_v)
+
+        f = out[remap[w + faces]]
+        ok = (f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])
+        f = f[ok]
+        self.n_tris += len(f)
+        if self._3mf:
+            self._3mf.add_vertices(new_v)
+            self._3mf.add_faces(f)
+        if self._stl:
+            self._stl.write(pts[first[remap[w + faces[ok]]]])
+
+        # Slide the window: new vertices, then the ones this block reused,
+        # go last; at most `window` kept
+        seen = np.zeros(len(first), bool)
+        seen[remap[w:]] = True
+        hit = np.zeros(w, bool)
+        hit[first[seen & ~new]] = True
+        self._win_v = np.concatenate([self._win_v[~hit], new_v, self._win_v[hit]])[-self.window:]
+        self._win_i = np.concatenate([self._win_i[~hit], out[new], self._win_i[hit]])[-self.window:]
+
+    # ── Output ───────────────────────────────────────────────────────────────
+
+    def close(self):
+        """Flush staged geometry and finish the files. Returns the tri count."""
+        self._flush()
+        self._close_streams()
+        for p in self._paths:
+            os.replace(p + TMP_SUFFIX, p)
+        self._paths = []
+        return self.n_tris
+
+    def discard(self):
+        """Stop writing and delete the unfinished files."""
+        self._close_streams()
+        for p in self._paths:
+            if os.path.exists(p + TMP_SUFFIX):
+                os.remove(p + TMP_SUFFIX)
+        self._paths = []
+
+    def _close_streams(self):
+        if self._stl:
+            self._stl.close()
+        if self._3mf:
+            self._3mf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self.discard()
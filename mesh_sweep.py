@@ -0,0 +1,137 @@
+"""
+Mesh Sweep — vectorized swept-tube builder
+===========================================
+Sweeps a 2D cross-section along a 3D path in one shot.
+
+A path is any function  path(t) -> (pos, T, N)  taking a 1D array of
+parameter values and returning three (n, 3) arrays: positions, unit
+tangents and unit normals.  The binormal is B = T x N, and a profile
+point (u, v) lands at  pos + u*N + v*B.
+
+sweep() returns the whole vertex grid and triangle index buffer as
+arrays (ring i, segment j -> vertex i*segs + j), optionally closed with
+flat end caps.  Nothing is built ring by ring or point by point.
+
+sweep_blocks() yields the same tube as a series of such grids, a few
+hundred rings each and sharing their boundary ring, for streaming very
+long sweeps into a mesh_stream.MeshSink.
+
+Used for the coil springs in generate_spring.py,
+generate_shock_absorber.py and generate_rocket_launcher.py.
+"""
+import math
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
+import mesh_prims
+
+# Helix axis -> cyclic permutation taking local (x, y, z=axis) to world
+_AXES = {'z': (0, 1, 2), 'x': (1, 2, 0), 'y': (2, 0, 1)}
+
+
+def helix(coil_r, pitch, axis='z', origin=(0.0, 0.0, 0.0)):
+    """Helix path of radius `coil_r` rising `pitch` per turn along `axis`.
+
+    The normal is the helix's principal normal (pointing at the axis).
+    """
+    ppr = pitch / (2 * math.pi)     # rise per radian
+    inv = np.argsort(_AXES[axis])
+    origin = np.asarray(origin, np.float64)
+
+    def path(t):
+        c, s = np.cos(t), np.sin(t)
+        pos = np.stack([coil_r * c, coil_r * s, ppr * t], axis=1)
+        T = np.stack([-coil_r * s, coil_r * c, np.full_like(t, ppr)], axis=1)
+        T /= np.linalg.norm(T, axis=1, keepdims=True)
+        N = np.stack([-c, -s, np.zeros_like(t)], axis=1)
+        # Cyclic axis permutations keep T x N right-handed
+        return pos[:, inv] + origin, T[:, inv], N[:, inv]
+
+    return path
+
+
+def circle(radius, segs):
+    """Circular cross-section: (segs, 2) array of (u, v) points."""
+    return radius * mesh_prims.unit_circle(segs)
+
+
+def sweep(path, t, profile, caps=True):
+    """Sweep `profile` along `path` sampled at parameters `t`.
+
+    Returns (verts, faces): float64 (n*segs [+2], 3) and int64 (k, 3).
+    Quads are wound so normals face away from the path; caps face -T at
+    the start and +T at the end.  `caps` may also be a (start, end) pair
+    of flags.
+    """
+    cap0, cap1 = (caps, caps) if isinstance(caps, bool) else caps
+    t = np.asarray(t, np.float64)
+    profile = np.asarray(profile, np.float64)
+    pos, T, N = path(t)
+    B = np.cross(T, N)
+    n, m = len(t), len(profile)
+
+    verts = (pos[:, None, :]
+             + profile[None, :, 0, None] * N[:, None, :]
+             + profile[None, :, 1, None] * B[:, None, :]).reshape(-1, 3)
+
+    # Quad (i, j) -> corners a=(i,j) b=(i,j+1) c=(i+1,j+1) d=(i+1,j)
+    i = np.arange(n - 1)[:, None]
+    j = np.arange(m)[None, :]
+    k = (j + 1) % m
+    a = (i * m + j).ravel()
+    b = (i * m + k).ravel()
+    c = ((i + 1) * m + k).ravel()
+    d = ((i + 1) * m + j).ravel()
+    faces = [np.stack([a, b, c], 1), np.stack([a, c, d], 1)]
+
+    j, k = j.ravel(), k.ravel()
+    if cap0:
+        faces.append(np.stack([np.full(m, len(verts)), k, j], 1))
+        verts = np.vstack([verts, pos[0]])
+    if cap1:
+        last = (n - 1) * m
+        faces.append(np.stack([np.full(m, len(verts)), last + j, last + k], 1))
+        verts = np.vstack([verts, pos[-1]])
+
+    # Interleave the two quad halves so each quad's triangles are adjacent
+    body = np.stack(faces[:2], 1).reshape(-1, 3)
+    return verts, np.vstack([body] + faces[2:])
+
+
+def sweep_blocks(path, t, profile, caps=True, rings=256):
+    """sweep() in pieces of at most `rings` + 1 rings.
+
+    Yields (verts, faces) per piece, each indexed from 0.  Consecutive
+    pieces repeat their shared ring, so welding them (as MeshSink does)
+    gives the same mesh as one sweep() call.
+    """
+    t = np.asarray(t, np.float64)
+    starts = range(0, max(len(t) - 1, 1), rings)
+    for s in starts:
+        e = min(s + rings, len(t) - 1)
+        yield sweep(path, t[s:e + 1], profile,
+                    (caps and s == 0, caps and e == len(t) - 1))
+
+
+def coil_params(coils, steps):
+    """Path parameters of a coil with `steps` rings per turn."""
+    return 2 * np.pi * np.arange(coils * steps + 1) / steps
+
+
+def coil(coil_r, wire_r, coils, pitch, steps, cross_segs,
+         axis='z', origin=(0.0, 0.0, 0.0)):
+    """Capped round-wire coil spring: `steps` rings per turn."""
+    return sweep(helix(coil_r, pitch, axis, origin), coil_params(coils, steps),
+                 circle(wire_r, cross_segs))
+
+
+def coil_blocks(coil_r, wire_r, coils, pitch, steps, cross_segs,
+                axis='z', origin=(0.0, 0.0, 0.0), rings=256):
+    """coil() as sweep_blocks() pieces."""
+    return sweep_blocks(helix(coil_r, pitch, axis, origin), coil_params(coils, steps),
+                        circle(wire_r, cross_segs), rings=rings)
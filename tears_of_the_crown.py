@@ -29,6 +29,7 @@ Loadouts:
 
 import pygame
 import sys
+import ctypes
 import math
 import random
 import json
@@ -48,6 +49,12 @@ except ImportError:
     print("ERROR: PyOpenGL required. Install with: pip install PyOpenGL PyOpenGL_accelerate")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy required. Install with: pip install numpy")
+    sys.exit(1)
+
 pygame.init()
 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
 
@@ -61,6 +68,7 @@ WORLD_SIZE = 200
 TILE_SIZE = 2.0
 VIEW_DIST = 80.0
 VIEW_TILES = 40
+CHUNK_TILES = 16  # Terrain tiles per chunk side (one VBO / display list each)
 GRAVITY = -20.0
 JUMP_VEL = 8.0
 WALK_SPEED = 5.0
@@ -241,16 +249,96 @@ def fractal_noise(x, y, octaves=5, seed=0):
         freq *= 2.0
     return val / total
 
-def get_height(wx, wz, seed=42):
-    """Get terrain height at world coordinates."""
-    nx = wx / (WORLD_SIZE * TILE_SIZE) * 4.0
-    nz = wz / (WORLD_SIZE * TILE_SIZE) * 4.0
-    h = fractal_noise(nx, nz, 6, seed)
-    # Create some flat areas
+def _hash2d_np(ix, iy, seed=0):
+    """_hash2d over int64 arrays.
+
+    The products wrap at 64 bits, which leaves the low 31 bits (all the
+    mask keeps) the same as Python's unbounded ints.
+    """
+    n = (ix * 374761393 + iy * 668265263 + seed * 1013904223) & 0x7FFFFFFF
+    n = ((n >> 13) ^ n) & 0x7FFFFFFF
+    n = (n * (n * n * 60493 + 19990303) + 1376312589) & 0x7FFFFFFF
+    return n / 0x7FFFFFFF
+
+def smooth_noise_np(x, y, seed=0):
+    """smooth_noise over float64 arrays (same values)."""
+    ix = np.floor(x).astype(np.int64)
+    iy = np.floor(y).astype(np.int64)
+    fx = x - ix
+    fy = y - iy
+    fx = fx * fx * (3 - 2 * fx)
+    fy = fy * fy * (3 - 2 * fy)
+    n00 = _hash2d_np(ix, iy, seed)
+    n10 = _hash2d_np(ix + 1, iy, seed)
+    n01 = _hash2d_np(ix, iy + 1, seed)
+    n11 = _hash2d_np(ix + 1, iy + 1, seed)
+    nx0 = n00 + (n10 - n00) * fx
+    nx1 = n01 + (n11 - n01) * fx
+    return nx0 + (nx1 - nx0) * fy
+
+def fractal_noise_np(x, y, octaves=5, seed=0):
+    """fractal_noise over float64 arrays (same values)."""
+    val = 0.0
+    amp = 1.0
+    freq = 1.0
+    total = 0.0
+    for _ in range(octaves):
+        val = val + smooth_noise_np(x * freq, y * freq, seed + _) * amp
+        total += amp
+        amp *= 0.5
+        freq *= 2.0
+    return val / total
+
+def _flatten(h):
+    """Create some flat areas."""
     if h > 0.35 and h < 0.55:
         h = lerp(h, 0.42, 0.6)
     return h
 
+def _height_noise(wx, wz, seed=42):
+    """Raw terrain noise at world coordinates (scalars or arrays)."""
+    noise = fractal_noise_np if isinstance(wx, np.ndarray) else fractal_noise
+    nx = wx / (WORLD_SIZE * TILE_SIZE) * 4.0
+    nz = wz / (WORLD_SIZE * TILE_SIZE) * 4.0
+    return noise(nx, nz, 6, seed)
+
+HEIGHTMAP_RES = 2  # Heightmap samples per tile
+_heightmaps = {}   # seed -> float32 noise, indexed [x sample, z sample]
+
+def build_heightmap(seed=42):
+    """Sample the terrain noise over the whole map in one go (done at load time)."""
+    n = WORLD_SIZE * HEIGHTMAP_RES + 1
+    w = np.arange(n) * (TILE_SIZE / HEIGHTMAP_RES)
+    wx, wz = np.meshgrid(w, w, indexing='ij')
+    hm = _height_noise(wx, wz, seed).astype(np.float32)
+    _heightmaps[seed] = hm
+    return hm
+
+def get_height(wx, wz, seed=42):
+    """Get terrain height at world coordinates.
+
+    The noise is a bilinear lookup in the precomputed heightmap (points
+    off the map evaluate it directly); flat areas are applied after
+    interpolating so their edges stay sharp.
+    """
+    hm = _heightmaps.get(seed)
+    if hm is None:
+        hm = build_heightmap(seed)
+    gx = wx * (HEIGHTMAP_RES / TILE_SIZE)
+    gz = wz * (HEIGHTMAP_RES / TILE_SIZE)
+    last = hm.shape[0] - 1
+    if not (0.0 <= gx < last and 0.0 <= gz < last):
+        return _flatten(_height_noise(wx, wz, seed))
+    ix = int(gx)
+    iz = int(gz)
+    fx = gx - ix
+    fz = gz - iz
+    h00 = hm.item(ix, iz)
+    h01 = hm.item(ix, iz + 1)
+    h0 = h00 + (hm.item(ix + 1, iz) - h00) * fx
+    h1 = h01 + (hm.item(ix + 1, iz + 1) - h01) * fx
+    return _flatten(h0 + (h1 - h0) * fz)
+
 def get_biome_from_height(h):
     if h < 0.18:
         return Biome.DEEP_WATER
@@ -2377,6 +2465,87 @@ class Camera:
         yaw_rad = math.radians(self.yaw)
         return math.cos(yaw_rad), -math.sin(yaw_rad)
 
+# ════════════════════════════════════════════════════════════
+# TERRAIN CHUNKS
+# ════════════════════════════════════════════════════════════
+_TILE_CORNERS = ((-0.5, -0.5), (0.5, -0.5), (0.5, 0.5), (-0.5, 0.5))
+_VERTEX_STRIDE = 9 * 4  # position, normal, color as float32
+
+class TerrainChunk:
+    """CHUNK_TILES x CHUNK_TILES terrain tiles drawn with a single GL call.
+
+    The tile quads are uploaded once to a vertex buffer (or compiled into
+    a display list where VBOs are unavailable) and only rebuilt after
+    invalidate().
+    """
+    def __init__(self, cx, cz):
+        self.cx, self.cz = cx, cz
+        self.tx0 = cx * CHUNK_TILES
+        self.tz0 = cz * CHUNK_TILES
+        self.tx1 = min(WORLD_SIZE, self.tx0 + CHUNK_TILES)
+        self.tz1 = min(WORLD_SIZE, self.tz0 + CHUNK_TILES)
+        self.vbo = None
+        self.display_list = None
+        self.count = 0
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def dist2(self, x, z):
+        """Squared distance from (x, z) to the chunk's footprint."""
+        hs = TILE_SIZE * 0.5
+        dx = max(self.tx0 * TILE_SIZE - hs - x, 0.0, x - (self.tx1 * TILE_SIZE - hs))
+        dz = max(self.tz0 * TILE_SIZE - hs - z, 0.0, z - (self.tz1 * TILE_SIZE - hs))
+        return dx * dx + dz * dz
+
+    def build(self, world):
+        """(Re)upload the chunk's tiles from the world's terrain cache."""
+        tiles = [world.get_terrain_tile(tx, tz)
+                 for tx in range(self.tx0, self.tx1)
+                 for tz in range(self.tz0, self.tz1)]
+        if bool(glGenBuffers):
+            tile = np.array([(wx, y, wz) + tuple(color) for wx, wz, y, color, _ in tiles],
+                            np.float32)
+            data = np.zeros((len(tiles), 4, 9), np.float32)
+            data[:, :, 0:3] = tile[:, None, 0:3]
+            corners = np.array(_TILE_CORNERS, np.float32) * np.float32(TILE_SIZE)
+            data[:, :, 0] += corners[:, 0]
+            data[:, :, 2] += corners[:, 1]
+            data[:, :, 4] = 1.0
+            data[:, :, 6:9] = tile[:, None, 3:6]
+            if self.vbo is None:
+                self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            if self.display_list is None:
+                self.display_list = glGenLists(1)
+            glNewList(self.display_list, GL_COMPILE)
+            draw_ground_tile_batch([(wx, wz, TILE_SIZE, y, color)
+                                    for wx, wz, y, color, _ in tiles])
+            glEndList()
+        self.count = len(tiles) * 4
+        self.dirty = False
+
+    def draw(self):
+        if self.vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(3, GL_FLOAT, _VERTEX_STRIDE, ctypes.c_void_p(0))
+            glNormalPointer(GL_FLOAT, _VERTEX_STRIDE, ctypes.c_void_p(12))
+            glColorPointer(3, GL_FLOAT, _VERTEX_STRIDE, ctypes.c_void_p(24))
+            glDrawArrays(GL_QUADS, 0, self.count)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_NORMAL_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        elif self.display_list is not None:
+            glCallList(self.display_list)
+
 # ════════════════════════════════════════════════════════════
 # WORLD
 # ════════════════════════════════════════════════════════════
@@ -2390,10 +2559,12 @@ class World:
         self.cookie_monster: CookieMonsterNPC = None
         self.grandma: GrandmaNPC = None
         self.evil_grandma: EvilGrandmaNPC = None
-        self.trees = []  # (x, z, type, height)
-        self.rocks = []  # (x, z, size)
+        self.trees = []  # (x, z, type, height, ground_y)
+        self.rocks = []  # (x, z, size, ground_y)
         self.pickups = []  # (x, y, z, type, collected)
         self._terrain_cache = {}
+        self._chunks = {}  # (cx, cz) -> TerrainChunk
+        build_heightmap(seed)
         self._generate()
 
     def _generate(self):
@@ -2511,7 +2682,7 @@ class World:
                 if ty is not None:
                     tree_h = random.uniform(2.5, 5.0)
                     tree_type = random.choice(['oak', 'pine', 'birch'])
-                    self.trees.append((tx, tz, tree_type, tree_h))
+                    self.trees.append((tx, tz, tree_type, tree_h, ty))
 
         # Generate rocks
         for _ in range(150):
@@ -2520,7 +2691,7 @@ class World:
             h = get_height(rx, rz, self.seed)
             biome = get_biome_from_height(h)
             if biome in (Biome.MOUNTAIN, Biome.PLAINS, Biome.FOREST):
-                self.rocks.append((rx, rz, random.uniform(0.3, 1.2)))
+                self.rocks.append((rx, rz, random.uniform(0.3, 1.2), self._ground_y(rx, rz)))
 
         # Pickups (weapons, materials)
         pickup_types = ['arrows', 'heart', 'material', 'weapon_spear', 'weapon_fire_rod', 'weapon_bombs']
@@ -2546,23 +2717,58 @@ class World:
             self._terrain_cache[key] = (wx, wz, y, color, biome)
         return self._terrain_cache[key]
 
+    def _ground_y(self, wx, wz):
+        """Ground height a static decoration stands on."""
+        wy = walkable_y(wx, wz, self.seed)
+        return 0 if wy is None else wy
+
+    def invalidate_terrain(self, tx=None, tz=None):
+        """Forget cached terrain for tile (tx, tz), or everywhere if omitted.
+
+        Call after changing the ground there: the tile's chunk is rebuilt
+        the next time it is drawn and trees / rocks on it are re-planted.
+        """
+        if tx is None:
+            self._terrain_cache.clear()
+            for chunk in self._chunks.values():
+                chunk.invalidate()
+        else:
+            self._terrain_cache.pop((tx, tz), None)
+            chunk = self._chunks.get((tx // CHUNK_TILES, tz // CHUNK_TILES))
+            if chunk is not None:
+                chunk.invalidate()
+        self._replant(tx, tz)
+
+    def _replant(self, tx=None, tz=None):
+        """Re-resolve cached ground heights of decorations on a tile (or all)."""
+        def on_tile(x, z):
+            return tx is None or (round(x / TILE_SIZE) == tx and round(z / TILE_SIZE) == tz)
+        self.trees = [t[:4] + (self._ground_y(t[0], t[1]),) if on_tile(t[0], t[1]) else t
+                      for t in self.trees]
+        self.rocks = [r[:3] + (self._ground_y(r[0], r[1]),) if on_tile(r[0], r[1]) else r
+                      for r in self.rocks]
+
     def draw_terrain(self, player_x, player_z):
-        """Draw visible terrain tiles around the player."""
+        """Draw visible terrain chunks around the player."""
         ptx = int(player_x / TILE_SIZE)
         ptz = int(player_z / TILE_SIZE)
-
-        # Batch draw terrain
-        glBegin(GL_QUADS)
-        for tx in range(max(0, ptx - VIEW_TILES), min(WORLD_SIZE, ptx + VIEW_TILES)):
-            for tz in range(max(0, ptz - VIEW_TILES), min(WORLD_SIZE, ptz + VIEW_TILES)):
-                wx, wz, y, color, biome = self.get_terrain_tile(tx, tz)
+        n_chunks = (WORLD_SIZE + CHUNK_TILES - 1) // CHUNK_TILES
+        c0x = max(0, (ptx - VIEW_TILES) // CHUNK_TILES)
+        c1x = min(n_chunks - 1, (ptx + VIEW_TILES) // CHUNK_TILES)
+        c0z = max(0, (ptz - VIEW_TILES) // CHUNK_TILES)
+        c1z = min(n_chunks - 1, (ptz + VIEW_TILES) // CHUNK_TILES)
+
+        for cx in range(c0x, c1x + 1):
+            for cz in range(c0z, c1z + 1):
+                chunk = self._chunks.get((cx, cz))
+                if chunk is None:
+                    chunk = self._chunks[(cx, cz)] = TerrainChunk(cx, cz)
                 # Distance check
-                dx = wx - player_x
-                dz = wz - player_z
-                if dx * dx + dz * dz > VIEW_DIST * VIEW_DIST:
+                if chunk.dist2(player_x, player_z) > VIEW_DIST * VIEW_DIST:
                     continue
-                draw_flat_quad(wx, wz, TILE_SIZE, y, color)
-        glEnd()
+                if chunk.dirty:
+                    chunk.build(self)
+                chunk.draw()
 
         # Water plane
         glEnable(GL_BLEND)
@@ -2584,14 +2790,11 @@ class World:
         vd2 = VIEW_DIST * VIEW_DIST * 0.5
 
         # Trees
-        for tx, tz, tree_type, tree_h in self.trees:
+        for tx, tz, tree_type, tree_h, ty in self.trees:
             dx = tx - player_x
             dz = tz - player_z
             if dx * dx + dz * dz > vd2:
                 continue
-            ty = walkable_y(tx, tz, self.seed)
-            if ty is None:
-                ty = 0
             # Trunk
             trunk_color = (100, 70, 40) if tree_type != 'birch' else (200, 195, 180)
             draw_cylinder(tx, ty, tz, 0.2, tree_h * 0.6, trunk_color, 6)
@@ -2607,14 +2810,11 @@ class World:
                 draw_sphere(tx, ty + tree_h * 0.7, tz, tree_h * 0.3, (60, 140, 50))
 
         # Rocks
-        for rx, rz, rs in self.rocks:
+        for rx, rz, rs, ry in self.rocks:
             dx = rx - player_x
             dz = rz - player_z
             if dx * dx + dz * dz > vd2:
                 continue
-            ry = walkable_y(rx, rz, self.seed)
-            if ry is None:
-                ry = 0
             draw_sphere(rx, ry + rs * 0.3, rz, rs * 0.5, (130, 125, 115))
 
         # Pickups
@@ -3653,11 +3853,7 @@ class Game:
         glLightfv(GL_LIGHT0, GL_SPECULAR, light_specular)
 
         # Fog
-        glEnable(GL_FOG)
-        glFogfv(GL_FOG_COLOR, [*C_FOG, 1.0])
-        glFogi(GL_FOG_MODE, GL_LINEAR)
-        glFogf(GL_FOG_START, VIEW_DIST * 0.6)
-        glFogf(GL_FOG_END, VIEW_DIST)
+        self._set_world_fog()
 
         # Projection
         glMatrixMode(GL_PROJECTION)
@@ -3667,6 +3863,14 @@ class Game:
 
         glEnable(GL_NORMALIZE)
 
+    def _set_world_fog(self):
+        """Overworld fog: fully fogged at VIEW_DIST, where terrain chunks are culled."""
+        glEnable(GL_FOG)
+        glFogfv(GL_FOG_COLOR, [*C_FOG, 1.0])
+        glFogi(GL_FOG_MODE, GL_LINEAR)
+        glFogf(GL_FOG_START, VIEW_DIST * 0.6)
+        glFogf(GL_FOG_END, VIEW_DIST)
+
     def run(self):
         """Main game loop."""
         while self.running:
@@ -5066,6 +5270,8 @@ class Game:
             return
 
         # ── 3D World rendering ──
+        # The sky island sets its own fog; chunk culling relies on this one
+        self._set_world_fog()
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
         self.camera.apply(self.player)